@@ -1,16 +1,15 @@
+import time
+STARTUP_BEGIN = time.perf_counter()  # Início da inicialização, para medir o tempo até a janela ficar pronta
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
-import socket
-import subprocess
-import platform
-import re
-import csv
-import webbrowser
-import ipaddress
-import threading
 import queue
-from concurrent.futures import ThreadPoolExecutor
 import os
+from hostflow_core import (MAX_HOSTS, MAX_THREADS, COLUMNS, is_valid_host, unique_hosts, get_inventory,
+                           analyze_host, classify_result, shutdown_engine)
+
+# Módulos usados apenas por ações do usuário (varredura, relatórios, conexões) são importados
+# dentro das funções que os utilizam, para reduzir o tempo de inicialização.
 
 # ========================================================================
 # Nome do Sistema: HostFlow
@@ -24,229 +23,326 @@ import os
 # Windows 11 Enterprise
 # ========================================================================
 
-# Defina o número máximo de hosts permitidos
-MAX_HOSTS = 3000  # 11 por segundo com 300 threads simultâneas
-# Limite de threads em uso
-MAX_THREADS = 300  # 11 por segundo com 300 threads simultâneas
-# Limites de TTL para determinar o sistema operacional
-TTL_MIN_LINUX = 1
-TTL_MAX_LINUX = 100
-TTL_MIN_WINDOWS = 101
-TTL_MAX_WINDOWS = 255
-
 # Variável global para armazenar os hosts
 hosts_list = []
 # Variável global para armazenar o caminho do arquivo aberto
 current_file_path = None
-
-def is_valid_host(host):
-    """Verifica se o host é um IP ou um nome de host válido."""
-    try:
-        ipaddress.ip_address(host)  # Valida se é um IP
-        return True
-    except ValueError:
-        hostname_pattern = re.compile(r'^[a-zA-Z0-9.-]+$')  # Regex para hostname
-        return bool(hostname_pattern.match(host))
-
-def ping(host):
-    """Realiza um ping no host e retorna o resultado e TTL."""
-    param = '-n' if platform.system().lower() == 'windows' else '-c'
-    command = ['ping', param, '1', host]
-    try:
-        output = subprocess.check_output(command, stderr=subprocess.STDOUT, universal_newlines=True)
-        ttl_match = re.search(r'TTL=(\d+)', output)
-        ttl = ttl_match.group(1) if ttl_match else 'Não encontrado'
-        return True, ttl  # Retorna True se o ping for bem-sucedido
-    except subprocess.CalledProcessError:
-        return False, 'Erro ao pingar'  # Retorna False se o ping falhar
-
-def dns_lookup(host):
-    """Realiza a resolução de DNS do host e retorna o IP e o hostname reverso."""
-    try:
-        ip = socket.gethostbyname(host)
-        reverse_host = socket.gethostbyaddr(ip)
-        return ip, reverse_host[0]
-    except (socket.gaierror, socket.herror):
-        return None, None
-
-def check_port(ip, port):
-    """Verifica se a porta está aberta no IP fornecido."""
-    try:
-        with socket.create_connection((ip, port), timeout=2) as sock:
-            return True
-    except (socket.timeout, ConnectionRefusedError):
-        return False
-
-def get_os(ttl):
-    """Determina o sistema operacional baseado no TTL."""
-    if ttl != 'Não encontrado':
-        ttl_value = int(ttl)
-        if TTL_MIN_LINUX <= ttl_value <= TTL_MAX_LINUX:
-            return 'Linux'
-        elif TTL_MIN_WINDOWS <= ttl_value <= TTL_MAX_WINDOWS:
-            return 'Windows'
-    return 'Desconhecido'
-
-def read_inventory(file_path):
-    """Lê o arquivo CSV e retorna um dicionário com as informações."""
-    inventory = {}
+# Varredura (ScanJob) em andamento
+current_job = None
+# Controlador das varreduras em segundo plano (criado na primeira varredura)
+scan_controller = None
+# Pré-carregamento de DNS dos hosts do inventário (desative para não fazer consultas em segundo plano)
+DNS_PREFETCH = True
+# Atraso (ms) após a abertura da janela para iniciar o pré-carregamento de DNS
+DNS_PREFETCH_DELAY = 2000
+# Pré-carregamento de DNS em andamento
+dns_prefetcher = None
+# Colunas da tabela de resultados
+columns = COLUMNS
+# Índices das linhas da tabela: host -> linhas (a mesma lista pode repetir um host) e linha -> host
+rows_by_host = {}
+host_by_row = {}
+# Widgets da janela principal (criados em build_app)
+app = results_tree = scrollbar_vertical = progress = legend_frame = pause_button = None
+checkbox_vars = {}
+# Limites de cada atualização da tabela (resultados e segundos), para não travar a interface
+RESULTS_PER_TICK = 500
+TICK_BUDGET = 0.02
+# Tempo máximo (ms) esperado para a inicialização
+STARTUP_BUDGET_MS = 500
+# Descrição de cada cor (categoria) da tabela
+COLOR_LABELS = {
+    'green': 'Acessível Remotamente',
+    'yellow': 'Sem Acesso Remoto',
+    'orange': 'Erro DNS',
+    'red': 'Outros Erros'
+}
+# Intervalo (ms) para atualizar a janela de estimativa
+ESTIMATE_REFRESH_INTERVAL = 500
+# Intervalo (ms) para priorizar as linhas visíveis após a rolagem da tabela
+VISIBLE_PRIORITY_DELAY = 200
+
+def insert_row(host, values=None, tags=()):
+    """Insere uma linha na tabela e a registra nos índices de linhas."""
+    if values is None:
+        values = (host,) + ("",) * (len(columns) - 1)
+    item = results_tree.insert('', tk.END, values=values, tags=tags)
+    rows_by_host.setdefault(host, []).append(item)
+    host_by_row[item] = host
+    return item
+
+def delete_rows(items):
+    """Remove as linhas da tabela e dos índices de linhas."""
+    for item in items:
+        host = host_by_row.pop(item, None)
+        if host is not None:
+            rows_by_host[host].remove(item)
+            if not rows_by_host[host]:
+                del rows_by_host[host]
+    if items:
+        results_tree.delete(*items)
+
+def clear_rows():
+    """Remove todas as linhas da tabela (inclusive as ocultas pelo filtro de cores)."""
+    if host_by_row:
+        results_tree.delete(*host_by_row)
+    rows_by_host.clear()
+    host_by_row.clear()
+
+def load_inventory():
+    """Carrega o inventário, avisando o usuário em caso de erro."""
     try:
-        with open(file_path, newline='', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile, delimiter=';')
-            for row in reader:
-                code = row['Código']  # A chave deve corresponder ao cabeçalho
-                inventory[code] = row
-    except FileNotFoundError:
-        messagebox.showerror("Erro", f"O arquivo {file_path} não foi encontrado.")
+        return get_inventory()
+    except FileNotFoundError as e:
+        messagebox.showerror("Erro", f"O arquivo {e.filename} não foi encontrado.")
     except KeyError as e:
         messagebox.showerror("Erro", f"A chave {e} não foi encontrada no arquivo CSV.")
-    return inventory
-
-def analyze_host(host, inventory, result_queue):
-    """Analisa um único host e coloca os resultados na fila."""
-    original_host = host
-    x_host = host + 'x'  # Cria o host com 'x' no final
-
-    # Testa ambos os hosts
-    original_ping_result, original_ttl = ping(original_host)
-    x_ping_result, x_ttl = ping(x_host)
-
-    # Determina qual host está pingando
-    pinging_host = original_host if original_ping_result else x_host if x_ping_result else None
-
-    # Determina informações adicionais
-    if pinging_host:
-        ip, reverse_host = dns_lookup(pinging_host)
-        ssh_open = check_port(ip, 22) if ip else False
-        rdp_open = check_port(ip, 3389) if ip else False
-        os_name = get_os(original_ttl if pinging_host == original_host else x_ttl)
-        localization_info = inventory.get(original_host, {})
-    else:
-        ip, reverse_host = dns_lookup(original_host)  # Tenta resolver o DNS do original_host
-        ssh_open = check_port(ip, 22) if ip else False
-        rdp_open = check_port(ip, 3389) if ip else False
-        os_name = 'Não encontrado'
-        localization_info = inventory.get(original_host, {})
-
-    # Coloca os resultados na fila
-    result_queue.put((original_host, pinging_host, reverse_host, 'True' if pinging_host else 'False',
-                      ip or 'Não resolvido', original_ttl if pinging_host == original_host else x_ttl,
-                      os_name, ssh_open, rdp_open,
-                      localization_info.get('Local', 'Não encontrado'),
-                      localization_info.get('Prédio', 'Não encontrado'),
-                      localization_info.get('Andar', 'Não encontrado'),
-                      localization_info.get('Escritório', 'Não encontrado'),
-                      localization_info.get('Obsoleto', 'Não encontrado'),
-                      localization_info.get('Anotação', 'Não encontrado')))
-
-def analyze_hosts():
-    """Analisa os hosts na tabela e preenche os resultados."""
-    global hosts_list, current_file_path  # Acessa as variáveis globais
+    return {}
+
+def get_scan_controller():
+    """Retorna o controlador de varreduras, criando-o na primeira utilização."""
+    global scan_controller
+    if scan_controller is None:
+        from scan_controller import ScanController
+        scan_controller = ScanController(max_workers=MAX_THREADS)
+    return scan_controller
+
+def analyze_hosts(sample=None):
+    """Analisa os hosts na tabela (ou apenas a amostra informada) e preenche os resultados."""
+    global hosts_list, current_file_path, current_job  # Acessa as variáveis globais
 
     if not hosts_list:
         messagebox.showwarning("Aviso", "Nenhum host encontrado na tabela!")
         return
 
+    cancel_scan()  # Uma nova análise substitui a anterior
+
+    targets = hosts_list if sample is None else sample
+    sample_set = None if sample is None else set(sample)
     progress['value'] = 0
-    progress['maximum'] = len(hosts_list)
+    progress['maximum'] = len(targets)
     app.update_idletasks()
 
-    inventory = read_inventory('inventário.csv')  # Altere para o caminho correto se necessário
+    inventory = load_inventory()
     result_queue = queue.Queue()
 
-    # Usando ThreadPoolExecutor para limitar o número de threads
-    with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-        for host in hosts_list:  # Usa a lista de hosts armazenada
-            executor.submit(analyze_host, host, inventory, result_queue)
+    # Retoma a partir do diário uma varredura interrompida da mesma lista de hosts
+    # (a amostra usa o diário da lista completa, de modo que a varredura completa continua a partir dela)
+    from scan_journal import ScanJournal, scan_id_for
+    journal = ScanJournal(scan_id_for(hosts_list))
+    for result in journal.completed.values():
+        result_queue.put(result)
+    remaining_hosts = [host for host in targets if host not in journal.completed]
+    if journal.completed:
+        print(f"Retomando varredura {journal.scan_id}: {len(journal.completed)} hosts já concluídos.")
+
+    estimate = None
+    if sample is not None:
+        from sampling import ProportionEstimate
+        estimate = ProportionEstimate(len(set(hosts_list)), len(sample))
+        show_estimate_window(estimate)
+
+    def scan_host(host, scan_job):
+        result = analyze_host(host, inventory, result_queue, scan_job)
+        if result is not None:
+            journal.append(host, result)
+
+    def scan_finished(scan_job):
+        # Varreduras canceladas (e amostras) mantêm o diário para serem retomadas depois
+        if scan_job.is_cancelled() or sample is not None:
+            journal.close()
+        else:
+            journal.finish()
+
+    # A varredura roda em segundo plano; a interface apenas consome a fila de resultados
+    job = get_scan_controller().submit(remaining_hosts, scan_host, on_done=scan_finished)
+    current_job = job
+    pause_button.config(text="Pausar")
+    prioritize_visible_hosts()
 
     # Atualiza a interface enquanto as threads estão rodando
     def update_results():
-        while not result_queue.empty():
-            result = result_queue.get()
-
-            # Atualiza a linha correspondente ao host
-            for item in results_tree.get_children():
-                if results_tree.item(item)['values'][0] == result[0]:  # Compara pelo host
-                    results_tree.item(item, values=result)
-
-                    # Variáveis para a lógica
-                    SO = result[6]
-                    RDP_Aberta = result[8]
-                    SSH_Aberta = result[7]
-                    PING = result[1] == 'True'
-                    DNS_Reverso = result[2]
-                    HOST_PINGANDO = result[0]
-
-                    # Lógica para determinar se a linha deve ficar vermelha ou verde
-                    C_Windows_Acessivel_Remotamente = ((SO == "Windows") and
-                                                       (DNS_Reverso.lower().replace('.domain.biz',
-                                                                                    '') == HOST_PINGANDO.lower())) and (
-                                                              RDP_Aberta is True)
-                    C_Windows_Sem_Acesso_Remoto = ((SO == "Windows") and
-                                                   (DNS_Reverso.lower().replace('.domain.biz',
-                                                                                '') == HOST_PINGANDO.lower())) and (
-                                                          RDP_Aberta is False)
-
-                    C_Linux_Acessivel_Remotamente = (SO == "Linux") and (
-                            DNS_Reverso.lower().replace('x.domain.biz', '') == HOST_PINGANDO.lower()) and (
-                                                            (RDP_Aberta is True) and (SSH_Aberta is True))
-                    C_Linux_Sem_Acesso_Remotamente = (SO == "Linux") and (
-                            DNS_Reverso.lower().replace('x.domain.biz', '') == HOST_PINGANDO.lower()) and (
-                                                             (RDP_Aberta is False) and (SSH_Aberta is False))
-
-                    Erro_DNS = (DNS_Reverso is not None) and not (
-                            (DNS_Reverso.lower().replace('.domain.biz', '') == HOST_PINGANDO.lower()) or (
-                            DNS_Reverso.lower().replace('x.domain.biz', '') == HOST_PINGANDO.lower()))
-
-                    # Lógica para determinar se a linha deve ficar vermelha ou verde
-                    if C_Windows_Acessivel_Remotamente:
-                        results_tree.item(item, tags=('green',))  # Adiciona tag verde
-                    elif C_Linux_Acessivel_Remotamente:
-                        results_tree.item(item, tags=('green',))  # Adiciona tag verde
-                    elif C_Windows_Sem_Acesso_Remoto:
-                        results_tree.item(item, tags=('yellow',))  # Adiciona tag Amarelo
-                    elif C_Linux_Sem_Acesso_Remotamente:
-                        results_tree.item(item, tags=('yellow',))  # Adiciona tag Amarelo
-                    elif Erro_DNS:
-                        results_tree.item(item, tags=('orange',))  # Adiciona tag laranja
-                    else:
-                        results_tree.item(item, tags=('red',))  # Adiciona tag vermelha
-
-                    # Debugging
-                    print(
-                        f"Host: {HOST_PINGANDO}, SO: {SO}, PING: {PING}, RDP: {RDP_Aberta}, SSH: {SSH_Aberta}, DNS: {DNS_Reverso}")
-
-                    break
-
-            progress['value'] += 1
-            app.update_idletasks()
-
-        if any(thread.is_alive() for thread in threading.enumerate() if thread != threading.main_thread()):
-            app.after(100, update_results)  # Continua verificando
+        if job.is_cancelled():
+            return  # Varredura substituída ou cancelada: descarta os resultados restantes
+
+        # Aplica no máximo RESULTS_PER_TICK resultados ou TICK_BUDGET segundos por vez
+        tick_end = time.perf_counter() + TICK_BUDGET
+        applied = 0
+        while applied < RESULTS_PER_TICK and time.perf_counter() < tick_end:
+            try:
+                result = result_queue.get_nowait()
+            except queue.Empty:
+                break
+            applied += 1
+            color = classify_result(result)
+
+            # Atualiza todas as linhas correspondentes ao host
+            for item in rows_by_host.get(result[0], ()):
+                results_tree.item(item, values=result, tags=(color,))
+
+                # Debugging
+                print(
+                    f"Host: {result[0]}, SO: {result[6]}, PING: {result[3]}, RDP: {result[8]}, SSH: {result[7]}, DNS: {result[2]}")
+
+            if sample_set is None or result[0] in sample_set:
+                progress['value'] += 1
+                if estimate is not None:
+                    estimate.add(color)
+
+        if job.done.is_set() and result_queue.empty():
+            print(f"Varredura {job.job_id} finalizada.")  # Finaliza
+        elif not result_queue.empty():
+            app.after(1, update_results)  # Ainda há resultados: continua logo após a interface processar os eventos
         else:
-            app.after(100, update_results)  # Finaliza
+            app.after(100, update_results)  # Continua verificando
 
     app.after(100, update_results)  # Inicia a atualização
 
 
+def quick_estimate():
+    """Analisa uma amostra aleatória, estratificada por sub-rede, e estima a proporção de cada categoria."""
+    if not hosts_list:
+        messagebox.showwarning("Aviso", "Nenhum host encontrado na tabela!")
+        return
+    from sampling import SAMPLE_SIZE, draw_sample
+    size = simpledialog.askinteger("Estimativa Rápida", "Tamanho da amostra:",
+                                   initialvalue=min(SAMPLE_SIZE, len(hosts_list)), minvalue=1)
+    if size:
+        analyze_hosts(sample=draw_sample(hosts_list, size))
+
+
+def show_estimate_window(estimate):
+    """Abre uma janela com as proporções estimadas, atualizada conforme chegam os resultados da amostra."""
+    estimate_window = tk.Toplevel(app)
+    estimate_window.title("Estimativa Rápida")
+    estimate_window.resizable(False, False)
+
+    estimate_frame = ttk.Frame(estimate_window, padding="10")
+    estimate_frame.pack(expand=True, fill=tk.BOTH)
+
+    status_label = tk.Label(estimate_frame, font=("Helvetica", 10, "bold"))
+    status_label.pack(anchor='w', pady=(0, 10))
+
+    category_labels = {}
+    for color, text in COLOR_LABELS.items():
+        row = ttk.Frame(estimate_frame)
+        row.pack(anchor='w', pady=2)
+        tk.Canvas(row, width=20, height=20, bg=color).pack(side=tk.LEFT, padx=5)
+        category_labels[color] = tk.Label(row, font=("Helvetica", 10))
+        category_labels[color].pack(side=tk.LEFT)
+
+    def continue_full_scan():
+        estimate_window.destroy()
+        analyze_hosts()  # Retoma a partir do diário: os hosts da amostra não são analisados novamente
+
+    continue_button = ttk.Button(estimate_frame, text="Continuar Varredura Completa", command=continue_full_scan)
+    continue_button.pack(pady=(10, 0))
+
+    def refresh():
+        if not estimate_window.winfo_exists():
+            return
+        status_label.config(text=f"Amostra: {estimate.total} de {estimate.sample_size} hosts "
+                                 f"(população: {estimate.population})")
+        for color, (proportion, low, high) in estimate.estimates().items():
+            category_labels[color].config(text=f"{COLOR_LABELS[color]}: {proportion:.1%} "
+                                               f"(IC 95%: {low:.1%} – {high:.1%})")
+        estimate_window.after(ESTIMATE_REFRESH_INTERVAL, refresh)
+
+    refresh()
+
+
+def cancel_scan():
+    """Cancela a varredura em andamento, abortando as sondas em execução."""
+    global current_job
+    if current_job is not None:
+        scan_controller.cancel(current_job.job_id)
+        current_job = None
+
+
+def toggle_pause_scan():
+    """Pausa ou retoma a varredura em andamento."""
+    if current_job is None or current_job.done.is_set():
+        return
+    if current_job.paused:
+        scan_controller.resume(current_job.job_id)
+        pause_button.config(text="Pausar")
+    else:
+        scan_controller.pause(current_job.job_id)
+        pause_button.config(text="Retomar")
+
+
+def prioritize_selected_hosts(event=None):
+    """Coloca os hosts selecionados na frente da fila de varredura."""
+    if current_job is not None:
+        # O índice guarda o host como texto (os valores da tabela convertem códigos numéricos em inteiros)
+        hosts = [host_by_row[item] for item in results_tree.selection() if item in host_by_row]
+        scan_controller.prioritize(current_job.job_id, hosts)
+
+
+def prioritize_visible_hosts():
+    """Coloca os hosts visíveis na tabela na frente da fila de varredura."""
+    global visible_priority_pending
+    visible_priority_pending = None
+    if current_job is None:
+        return
+    items = results_tree.get_children()
+    if not items:
+        return
+    first, last = results_tree.yview()
+    start = int(first * len(items))
+    end = min(len(items), int(last * len(items)) + 1)
+    hosts = [host_by_row[item] for item in items[start:end] if item in host_by_row]
+    scan_controller.prioritize(current_job.job_id, hosts)
+
+
+# Agendamento pendente da priorização das linhas visíveis
+visible_priority_pending = None
+
+
+def on_tree_scroll(first, last):
+    """Atualiza a barra de rolagem e agenda a priorização das linhas visíveis."""
+    global visible_priority_pending
+    scrollbar_vertical.set(first, last)
+    if current_job is not None and visible_priority_pending is None:
+        visible_priority_pending = app.after(VISIBLE_PRIORITY_DELAY, prioritize_visible_hosts)
+
+
+def start_dns_prefetch():
+    """Inicia o pré-carregamento de DNS dos hosts do inventário, pausado durante as varreduras."""
+    global dns_prefetcher
+    from dns_prefetch import DNSPrefetcher
+    dns_prefetcher = DNSPrefetcher(busy=lambda: current_job is not None and not current_job.done.is_set()).start()
+
+
+def on_closing():
+    """Cancela as varreduras em andamento e fecha a aplicação."""
+    if dns_prefetcher is not None:
+        dns_prefetcher.stop()
+    if scan_controller is not None:
+        scan_controller.shutdown()
+    shutdown_engine()
+    app.destroy()
+
+
 def paste_and_analyze(event=None):
     """Pega o texto da área de transferência, limpa a tabela, preenche a tabela e inicia a análise."""
     global hosts_list  # Usar a lista global
     try:
         clipboard_content = app.clipboard_get()
-        hosts = clipboard_content.strip().splitlines()
+        # Filtra os hosts válidos (e dentro do escopo) e remove os repetidos
+        hosts = unique_hosts(host.strip() for host in clipboard_content.splitlines() if is_valid_host(host.strip()))
 
         if len(hosts) > MAX_HOSTS:
             messagebox.showwarning("Aviso", f"O número máximo de hosts permitidos é {MAX_HOSTS}.")
             return
 
-        results_tree.delete(*results_tree.get_children())
+        cancel_scan()  # Cancela a varredura anterior antes de carregar a nova lista
+        clear_rows()
         hosts_list = []  # Limpa a lista de hosts
 
         for host in hosts:
-            if is_valid_host(host):
-                results_tree.insert('', tk.END, values=(host, "", "", "", "", "", "", "", "", "", "", "", "", "", ""))
-                hosts_list.append(host)  # Adiciona o host à lista
+            insert_row(host)
+            hosts_list.append(host)  # Adiciona o host à lista
 
         app.after(1000, analyze_hosts)
 
@@ -345,6 +441,7 @@ def extract_report():
         report_file.write(html_content)
 
     # Abrindo o arquivo HTML no navegador padrão
+    import webbrowser
     webbrowser.open(report_file_path)
     messagebox.showinfo("Relatório Gerado", "O relatório foi gerado e aberto com sucesso: relatorio_hosts.html")
 
@@ -387,6 +484,7 @@ def open_rdp(event, host_pingando):
     """Abre a conexão RDP para o host selecionado."""
     if host_pingando:  # Verifica se há um host pingando
         rdp_command = f'mstsc /v:{host_pingando}'  # Comando para abrir o RDP
+        import subprocess
         try:
             subprocess.Popen(rdp_command)
         except Exception as e:
@@ -404,18 +502,18 @@ def open_file():
         try:
             with open(file_path, 'r') as file:
                 hosts = file.readlines()
-                hosts = [host.strip() for host in hosts if is_valid_host(host.strip())]  # Filtra hosts válidos
+                hosts = unique_hosts(host.strip() for host in hosts if is_valid_host(host.strip()))  # Filtra hosts válidos
 
             if len(hosts) > MAX_HOSTS:
                 messagebox.showwarning("Aviso", f"O número máximo de hosts permitidos é {MAX_HOSTS}.")
                 return
 
-            results_tree.delete(*results_tree.get_children())  # Limpa a tabela
+            cancel_scan()  # Cancela a varredura anterior antes de carregar a nova lista
+            clear_rows()  # Limpa a tabela
             hosts_list = []  # Limpa a lista de hosts
 
             for host in hosts:
-                results_tree.insert('', tk.END,
-                                    values=(host, "", "", "", "", "", "", "", "", "", "", "", "", "", ""))
+                insert_row(host)
                 hosts_list.append(host)  # Adiciona o host à lista
 
             # Armazena o caminho do arquivo aberto e atualiza o título da janela
@@ -433,6 +531,7 @@ def save_hosts():
 
     if current_file_path:  # Verifica se há um arquivo atual
         try:
+            import csv
             with open(current_file_path, 'w', newline='', encoding='utf-8') as file:
                 writer = csv.writer(file, delimiter=';')
                 # Escreve os hosts na tabela
@@ -463,6 +562,7 @@ def open_ssh(host):
     ssh_key = simpledialog.askstring("Chave de Acesso", "Digite a chave de acesso:")
     if ssh_key:
         cmd_command = f"start cmd /k ssh {ssh_key}@{host}"
+        import subprocess
         try:
             subprocess.Popen(cmd_command, shell=True)
         except Exception as e:
@@ -475,7 +575,7 @@ def edit_host():
 
     if selected_items:  # Verifica se há itens selecionados
         selected_item = selected_items[0]  # Pega o primeiro item selecionado
-        current_host = results_tree.item(selected_item)['values'][0]  # Obtém o host atual
+        current_host = host_by_row[selected_item]  # Obtém o host atual
 
         # Abre uma caixa de diálogo para edição
         new_host = simpledialog.askstring("Modificar Host", "Edite o host:", initialvalue=current_host)
@@ -485,6 +585,11 @@ def edit_host():
             new_values = (new_host,) + tuple(
                 results_tree.item(selected_item)['values'][1:])  # Converte a lista em tupla
             results_tree.item(selected_item, values=new_values)
+            rows_by_host[current_host].remove(selected_item)
+            if not rows_by_host[current_host]:
+                del rows_by_host[current_host]
+            rows_by_host.setdefault(new_host, []).append(selected_item)
+            host_by_row[selected_item] = new_host
 
             # Atualiza a lista de hosts
             global hosts_list
@@ -536,15 +641,12 @@ def remove_selected_row(event=None):
     selected_items = results_tree.selection()  # Obtém os itens selecionados
 
     if selected_items:  # Verifica se há itens selecionados
-        for selected_item in selected_items:
-            item_value = results_tree.item(selected_item)['values'][0] if selected_item else None
-            if item_value:  # Verifica se o valor do item existe
-                results_tree.delete(selected_item)  # Remove o item da tabela
+        removed_hosts = {host_by_row[item] for item in selected_items if item in host_by_row}
+        delete_rows(selected_items)  # Remove os itens da tabela
 
-        # Também remove o host da lista global
+        # Também remove o host da lista global (em uma única passagem)
         global hosts_list
-        hosts_list = [host for host in hosts_list if
-                      host not in [results_tree.item(item)['values'][0] for item in selected_items]]
+        hosts_list = [host for host in hosts_list if host not in removed_hosts]
 
 
 # Variáveis globais para armazenar informações de arrastar e soltar
@@ -590,14 +692,10 @@ def organize_by_color():
     items = results_tree.get_children()
 
     colored_items = {'red': [], 'green': [], 'yellow': [], 'orange': []}
-    item_values = {}  # Dicionário para armazenar valores do item
-    item_tags = {}  # Dicionário para armazenar tags do item
 
-    # Agrupar itens por cor e armazenar os valores e tags
+    # Agrupar itens por cor
     for item in items:
-        tags = results_tree.item(item)['tags']
-        item_values[item] = results_tree.item(item)['values']  # Armazena os valores antes da deleção
-        item_tags[item] = tags  # Armazena as tags antes da deleção
+        tags = results_tree.item(item, 'tags')
         if 'red' in tags:
             colored_items['red'].append(item)
         elif 'green' in tags:
@@ -607,19 +705,17 @@ def organize_by_color():
         elif 'orange' in tags:
             colored_items['orange'].append(item)
 
-    # Limpar a tabela
-    results_tree.delete(*items)
+    # Remover os itens sem cor
+    colored = {item for items_of_color in colored_items.values() for item in items_of_color}
+    delete_rows([item for item in items if item not in colored])
 
-    # Reorganizar os itens na ordem desejada
+    # Reorganizar os itens na ordem desejada (movidos, mantendo valores, tags e os índices de linhas)
+    position = 0
     for color in ['green', 'yellow', 'orange', 'red']:  # Ajuste a ordem conforme necessário
         for item in colored_items[color]:
-            # Reinsere os itens usando os valores armazenados no dicionário
-            new_item = results_tree.insert('', 'end', values=item_values[item])
-            # Reaplica a tag de cor ao item
-            for tag in item_tags[item]:
-                results_tree.item(new_item, tags=(tag,))
+            results_tree.move(item, '', position)
+            position += 1
 
-# Lembre-se de adicionar as tags de cor novamente após inserir os itens.
 
 
 
@@ -646,180 +742,214 @@ def show_quantitative_report():
     report_message = "\n".join(f"{category}: {count}" for category, count in categories_count.items())
     messagebox.showinfo("Quantitativo de Hosts", report_message)
 
-# Função para chamar o script ping.py
-def run_ping_script():
-    try:
-        subprocess.Popen(['python', 'ping.py'])  # Supondo que ping.py esteja no mesmo diretório
-    except Exception as e:
-        messagebox.showerror("Erro", f"Não foi possível executar o teste de ping: {e}")
+def open_ping_monitor():
+    """Abre o monitor de ping em uma janela da própria aplicação, compartilhando o motor de análise."""
+    from ping import PingApp
+    ping_window = tk.Toplevel(app)
+    ping_app = PingApp(ping_window)
+    ping_window.protocol("WM_DELETE_WINDOW", ping_app.on_closing)
 
 
+def open_url(url):
+    """Abre o endereço no navegador padrão."""
+    import webbrowser
+    webbrowser.open(url)
 
-# Criação da janela principal
-app = tk.Tk()
-app.title("HostFlow")
-app.geometry("1000x600")
 
-# Criação da barra de menu
-menu_bar = tk.Menu(app)
+def update_table_visibility():
+    """Atualiza a visibilidade dos hosts na tabela com base nas cores selecionadas."""
+    for item in results_tree.get_children():
+        host_info = results_tree.item(item)['tags']
+        # Verifica se o host deve ser exibido com base nas checkboxes
+        if any(checkbox_vars[color].get() and color in host_info for color in checkbox_vars):
+            results_tree.item(item, open=True)  # Exibe o item
+        else:
+            results_tree.detach(item)  # Oculta o item
 
-# Menu Arquivo
-file_menu = tk.Menu(menu_bar, tearoff=0)
-file_menu.add_command(label="Abrir", command=open_file)
-file_menu.add_command(label="Salvar Hosts", command=save_hosts)  # Adiciona opção para salvar hosts
-file_menu.add_command(label="Salvar Como", command=save_hosts_as)  # Adiciona a opção "Salvar Como"
-menu_bar.add_cascade(label="Arquivo", menu=file_menu)
 
-# Adicionando o menu "Teste de Rede"
-network_test_menu = tk.Menu(menu_bar, tearoff=0)
-# Adicionando a opção "Teste de Ping"
-network_test_menu.add_command(label="Teste de Ping", command=run_ping_script)
-# Adicionando o menu "Teste de Rede" ao menu principal
-menu_bar.add_cascade(label="Teste de Rede", menu=network_test_menu)
+def create_legend_item_with_checkbox(color, text):
+    """Cria um item da legenda com um checkbox para controle de visibilidade."""
+    color_box = tk.Canvas(legend_frame, width=20, height=20, bg=color)
+    color_box.pack(side=tk.LEFT, padx=5)
+    checkbox = ttk.Checkbutton(legend_frame, text=text, variable=checkbox_vars[color],
+                               command=update_table_visibility)
+    checkbox.pack(side=tk.LEFT)
 
-# Adicionando o menu "Organizar"
-organize_menu = tk.Menu(menu_bar, tearoff=0)
-organize_menu.add_command(label="Organizar por Cor", command=organize_by_color)
-menu_bar.add_cascade(label="Organizar", menu=organize_menu)
 
+def build_app():
+    """Cria a janela principal, os menus, a tabela e os controles."""
+    global app, results_tree, scrollbar_vertical, progress, legend_frame, checkbox_vars, pause_button
 
-# Menu de Análise
-analysis_menu = tk.Menu(menu_bar, tearoff=0)
-analysis_menu.add_command(label="Quantitativo", command=show_quantitative_report)
-menu_bar.add_cascade(label="Análise", menu=analysis_menu)
+    # Criação da janela principal
+    app = tk.Tk()
+    app.title("HostFlow")
+    app.geometry("1000x600")
 
+    # Criação da barra de menu
+    menu_bar = tk.Menu(app)
 
+    # Menu Arquivo
+    file_menu = tk.Menu(menu_bar, tearoff=0)
+    file_menu.add_command(label="Abrir", command=open_file)
+    file_menu.add_command(label="Salvar Hosts", command=save_hosts)  # Adiciona opção para salvar hosts
+    file_menu.add_command(label="Salvar Como", command=save_hosts_as)  # Adiciona a opção "Salvar Como"
+    menu_bar.add_cascade(label="Arquivo", menu=file_menu)
 
+    # Adicionando o menu "Teste de Rede"
+    network_test_menu = tk.Menu(menu_bar, tearoff=0)
+    # Adicionando a opção "Teste de Ping"
+    network_test_menu.add_command(label="Teste de Ping", command=open_ping_monitor)
+    # Adicionando o menu "Teste de Rede" ao menu principal
+    menu_bar.add_cascade(label="Teste de Rede", menu=network_test_menu)
 
-# Menu de Procedimentos
-procedures_menu = tk.Menu(menu_bar, tearoff=0)
-problems_menu = tk.Menu(procedures_menu, tearoff=0)
+    # Adicionando o menu "Organizar"
+    organize_menu = tk.Menu(menu_bar, tearoff=0)
+    organize_menu.add_command(label="Organizar por Cor", command=organize_by_color)
+    menu_bar.add_cascade(label="Organizar", menu=organize_menu)
 
-# Submenu "Problemas de IP"
-problems_menu.add_command(label="Devolver e Reservar IP", command=lambda: webbrowser.open(
-    "https://domain.biz.service-now.com/cs?id=sc_cat_item&sys_id=00000000000000000000000000000000"))
-procedures_menu.add_cascade(label="Problemas de IP", menu=problems_menu)
-menu_bar.add_cascade(label="Procedimentos", menu=procedures_menu)
 
-# Menu de Relatórios
-report_menu = tk.Menu(menu_bar, tearoff=0)
-report_menu.add_command(label="Extrair Relatório", command=extract_report)
-menu_bar.add_cascade(label="Relatórios", menu=report_menu)
+    # Menu de Análise
+    analysis_menu = tk.Menu(menu_bar, tearoff=0)
+    analysis_menu.add_command(label="Quantitativo", command=show_quantitative_report)
+    analysis_menu.add_command(label="Estimativa Rápida (Amostra)", command=quick_estimate)
+    menu_bar.add_cascade(label="Análise", menu=analysis_menu)
 
-# Adicionando o menu "Ajuda"
-help_menu = tk.Menu(menu_bar, tearoff=0)
-help_menu.add_command(label="Sobre", command=show_credits)
-menu_bar.add_cascade(label="Ajuda", menu=help_menu)
 
-# Configura a barra de menu na janela principal
-app.config(menu=menu_bar)
 
-# Frame para a tabela e a barra de rolagem
-frame = ttk.Frame(app)
-frame.pack(pady=5, fill=tk.BOTH, expand=True)
 
-# Tabela para resultados
-columns = ("Host", "Host Pingando", "DNS Reverso", "Ping", "IP", "TTL", "SO", "SSH Aberta", "RDP Aberta",
-           "Local", "Prédio", "Andar", "Escritório", "Obsoleto", "Anotação")
-results_tree = ttk.Treeview(frame, columns=columns, show='headings')
+    # Menu de Procedimentos
+    procedures_menu = tk.Menu(menu_bar, tearoff=0)
+    problems_menu = tk.Menu(procedures_menu, tearoff=0)
 
-for col in columns:
-    results_tree.heading(col, text=col)
+    # Submenu "Problemas de IP"
+    problems_menu.add_command(label="Devolver e Reservar IP", command=lambda: open_url(
+        "https://domain.biz.service-now.com/cs?id=sc_cat_item&sys_id=00000000000000000000000000000000"))
+    procedures_menu.add_cascade(label="Problemas de IP", menu=problems_menu)
+    menu_bar.add_cascade(label="Procedimentos", menu=procedures_menu)
 
-# Define uma largura fixa para todas as colunas
-fixed_width = 100  # Ajuste este valor conforme necessário
+    # Menu de Relatórios
+    report_menu = tk.Menu(menu_bar, tearoff=0)
+    report_menu.add_command(label="Extrair Relatório", command=extract_report)
+    menu_bar.add_cascade(label="Relatórios", menu=report_menu)
 
-for col in columns:
-    results_tree.column(col, width=fixed_width)
+    # Adicionando o menu "Ajuda"
+    help_menu = tk.Menu(menu_bar, tearoff=0)
+    help_menu.add_command(label="Sobre", command=show_credits)
+    menu_bar.add_cascade(label="Ajuda", menu=help_menu)
 
-# Barra de rolagem vertical
-scrollbar_vertical = ttk.Scrollbar(frame, orient="vertical", command=results_tree.yview)
-results_tree.configure(yscrollcommand=scrollbar_vertical.set)
-scrollbar_vertical.pack(side='right', fill='y')
+    # Configura a barra de menu na janela principal
+    app.config(menu=menu_bar)
 
-# Barra de rolagem horizontal
-scrollbar_horizontal = ttk.Scrollbar(frame, orient="horizontal", command=results_tree.xview)
-results_tree.configure(xscrollcommand=scrollbar_horizontal.set)
-scrollbar_horizontal.pack(side='bottom', fill='x')
+    # Frame para a tabela e a barra de rolagem
+    frame = ttk.Frame(app)
+    frame.pack(pady=5, fill=tk.BOTH, expand=True)
 
-results_tree.pack(pady=5, fill=tk.BOTH, expand=True)
+    # Tabela para resultados
+    results_tree = ttk.Treeview(frame, columns=columns, show='headings')
 
-# Barra de progresso
-progress = ttk.Progressbar(app, orient="horizontal", length=400, mode="determinate")
-progress.pack(pady=10)
+    for col in columns:
+        results_tree.heading(col, text=col)
 
-# Bind dos eventos de arrastar e soltar
-results_tree.bind('<ButtonPress-1>', on_tree_select)  # Evento de clique para começar a arrastar
-results_tree.bind('<B1-Motion>', on_tree_drag)  # Evento de movimento do mouse para arrastar
-results_tree.bind('<ButtonRelease-1>', on_tree_release)  # Evento de soltura
+    # Define uma largura fixa para todas as colunas
+    fixed_width = 100  # Ajuste este valor conforme necessário
 
-# Adicionando legenda de cores com checkboxes
-legend_frame = ttk.Frame(app)
-legend_frame.pack(pady=5)
+    for col in columns:
+        results_tree.column(col, width=fixed_width)
 
-# Dicionário para armazenar variáveis de controle dos checkboxes
-checkbox_vars = {
-    'green': tk.BooleanVar(value=True),
-    'yellow': tk.BooleanVar(value=True),
-    'orange': tk.BooleanVar(value=True),
-    'red': tk.BooleanVar(value=True)
-}
+    # Barra de rolagem vertical
+    scrollbar_vertical = ttk.Scrollbar(frame, orient="vertical", command=results_tree.yview)
+    results_tree.configure(yscrollcommand=on_tree_scroll)  # Também prioriza as linhas visíveis
+    scrollbar_vertical.pack(side='right', fill='y')
 
+    # Barra de rolagem horizontal
+    scrollbar_horizontal = ttk.Scrollbar(frame, orient="horizontal", command=results_tree.xview)
+    results_tree.configure(xscrollcommand=scrollbar_horizontal.set)
+    scrollbar_horizontal.pack(side='bottom', fill='x')
 
+    results_tree.pack(pady=5, fill=tk.BOTH, expand=True)
 
-def update_table_visibility():
-    """Atualiza a visibilidade dos hosts na tabela com base nas cores selecionadas."""
-    for item in results_tree.get_children():
-        host_info = results_tree.item(item)['tags']
-        # Verifica se o host deve ser exibido com base nas checkboxes
-        if any(checkbox_vars[color].get() and color in host_info for color in checkbox_vars):
-            results_tree.item(item, open=True)  # Exibe o item
-        else:
-            results_tree.detach(item)  # Oculta o item
+    # Barra de progresso
+    progress = ttk.Progressbar(app, orient="horizontal", length=400, mode="determinate")
+    progress.pack(pady=10)
 
+    # Bind dos eventos de arrastar e soltar
+    results_tree.bind('<ButtonPress-1>', on_tree_select)  # Evento de clique para começar a arrastar
+    results_tree.bind('<B1-Motion>', on_tree_drag)  # Evento de movimento do mouse para arrastar
+    results_tree.bind('<ButtonRelease-1>', on_tree_release)  # Evento de soltura
 
-def create_legend_item_with_checkbox(color, text):
-    """Cria um item da legenda com um checkbox para controle de visibilidade."""
-    color_box = tk.Canvas(legend_frame, width=20, height=20, bg=color)
-    color_box.pack(side=tk.LEFT, padx=5)
-    checkbox = ttk.Checkbutton(legend_frame, text=text, variable=checkbox_vars[color],
-                               command=update_table_visibility)
-    checkbox.pack(side=tk.LEFT)
+    # Adicionando legenda de cores com checkboxes
+    legend_frame = ttk.Frame(app)
+    legend_frame.pack(pady=5)
+
+    # Dicionário para armazenar variáveis de controle dos checkboxes
+    checkbox_vars = {
+        'green': tk.BooleanVar(value=True),
+        'yellow': tk.BooleanVar(value=True),
+        'orange': tk.BooleanVar(value=True),
+        'red': tk.BooleanVar(value=True)
+    }
+
+    # Adicionando itens à legenda com checkbox
+    for color, text in COLOR_LABELS.items():
+        create_legend_item_with_checkbox(color, text)
+
+    # Chama para atualizar a visibilidade inicialmente
+    update_table_visibility()
+
+    # Botões
+    button_frame = ttk.Frame(app)
+    button_frame.pack(pady=10)
+
+    analyze_button = ttk.Button(button_frame, text="Analisar Hosts", command=analyze_hosts)
+    analyze_button.pack(side=tk.LEFT, padx=5)
+
+    pause_button = ttk.Button(button_frame, text="Pausar", command=toggle_pause_scan)
+    pause_button.pack(side=tk.LEFT, padx=5)
+
+    cancel_button = ttk.Button(button_frame, text="Cancelar", command=cancel_scan)
+    cancel_button.pack(side=tk.LEFT, padx=5)
+
+    # Bind Ctrl+V para colar e analisar
+    app.bind('<Control-v>', paste_and_analyze)
+
+    # Bind do evento de duplo clique na árvore para abrir RDP
+    results_tree.bind('<Double-1>', lambda event: open_rdp(event, results_tree.item(results_tree.selection())['values'][1]))
 
+    # Prioriza na varredura os hosts selecionados
+    results_tree.bind('<<TreeviewSelect>>', prioritize_selected_hosts)
 
-# Adicionando itens à legenda com checkbox
-create_legend_item_with_checkbox('green', 'Acessível Remotamente')
-create_legend_item_with_checkbox('yellow', 'Sem Acesso Remoto')
-create_legend_item_with_checkbox('orange', 'Erro DNS')
-create_legend_item_with_checkbox('red', 'Outros Erros')
+    # Bind do botão direito do mouse para o menu de contexto
+    results_tree.bind('<Button-3>', show_context_menu)
 
-# Chama para atualizar a visibilidade inicialmente
-update_table_visibility()
+    # Bind da tecla Delete para remover a linha selecionada
+    app.bind('<Delete>', remove_selected_row)
 
-# Botões
-button_frame = ttk.Frame(app)
-button_frame.pack(pady=10)
+    # Adiciona as tags de cor
+    results_tree.tag_configure('red', background='red')
+    results_tree.tag_configure('green', background='green')
+    results_tree.tag_configure('yellow', background='yellow')
+    results_tree.tag_configure('orange', background='orange')
 
-analyze_button = ttk.Button(button_frame, text="Analisar Hosts", command=analyze_hosts)
-analyze_button.pack(side=tk.LEFT, padx=5)
+    # Cancela as varreduras ao fechar a janela
+    app.protocol("WM_DELETE_WINDOW", on_closing)
 
-# Bind Ctrl+V para colar e analisar
-app.bind('<Control-v>', paste_and_analyze)
 
-# Bind do evento de duplo clique na árvore para abrir RDP
-results_tree.bind('<Double-1>', lambda event: open_rdp(event, results_tree.item(results_tree.selection())['values'][1]))
+def report_startup_time():
+    """Mostra o tempo de inicialização (até a janela ficar pronta para uso)."""
+    elapsed = (time.perf_counter() - STARTUP_BEGIN) * 1000
+    print(f"Tempo de inicialização: {elapsed:.0f} ms")
+    if elapsed > STARTUP_BUDGET_MS:
+        print(f"Aviso: inicialização acima do limite de {STARTUP_BUDGET_MS} ms.")
 
-# Bind do botão direito do mouse para o menu de contexto
-results_tree.bind('<Button-3>', show_context_menu)
 
-# Bind da tecla Delete para remover a linha selecionada
-app.bind('<Delete>', remove_selected_row)
+def main():
+    """Inicia a aplicação."""
+    build_app()
+    app.after_idle(report_startup_time)
+    if DNS_PREFETCH:
+        app.after(DNS_PREFETCH_DELAY, start_dns_prefetch)
+    app.mainloop()
 
-# Adiciona as tags de cor
-results_tree.tag_configure('red', background='red')
-results_tree.tag_configure('green', background='green')
-results_tree.tag_configure('yellow', background='yellow')
-results_tree.tag_configure('orange', background='orange')
 
-# Inicia a aplicação
-app.mainloop()
+if __name__ == "__main__":
+    main()
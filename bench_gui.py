@@ -0,0 +1,322 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+# ========================================================================
+# Benchmark de responsividade da interface do HostFlow
+# Abre a janela principal (em um Xvfb ou com a janela oculta), carrega listas
+# sintéticas de 1k/10k/100k hosts e inunda a fila com resultados prontos,
+# medindo:
+#   - a latência dos quadros do laço principal do Tk durante a inundação
+#   - o tempo de carga da lista e de aplicação de todos os resultados
+#   - o tempo de ordenação (organize_by_color), filtro (update_table_visibility)
+#     e relatório (extract_report)
+#   - a memória (RSS) do processo
+# Os resultados podem ser gravados em JSON (--json) e comparados com uma
+# execução anterior (--baseline), falhando em caso de regressão.
+#
+#   python bench_gui.py --sizes 1000 10000 --json atual.json --baseline base.json
+# ========================================================================
+
+# Quantidades de hosts padrão
+DEFAULT_SIZES = (1000, 10000, 100000)
+# Intervalo (ms) esperado entre quadros do laço principal (cerca de 60 quadros por segundo)
+FRAME_INTERVAL = 16
+# Intervalo (ms) entre verificações do fim da aplicação dos resultados
+WATCH_INTERVAL = 50
+# Tempo máximo (segundos) para aplicar os resultados de uma lista
+DEFAULT_TIMEOUT = 600
+# Aumento relativo tolerado em relação à execução de referência antes de acusar regressão
+DEFAULT_TOLERANCE = 0.25
+# Métricas comparadas com a referência (valores maiores são piores)
+COMPARED_METRICS = ('load_s', 'apply_s', 'frame_p95_ms', 'frame_max_ms', 'sort_s', 'filter_s', 'report_s',
+                    'rss_mb')
+# Proporção sintética das categorias (cores)
+COLOR_WEIGHTS = {'green': 0.4, 'yellow': 0.3, 'orange': 0.2, 'red': 0.1}
+# Display usado pelo Xvfb iniciado pelo benchmark
+XVFB_DISPLAY = ':99'
+
+
+def synthetic_results(size, seed=0):
+    """Gera os hosts e os resultados sintéticos (uma tupla de analyze_host por host) de cada categoria."""
+    rng = random.Random(seed)
+    colors = rng.choices(list(COLOR_WEIGHTS), weights=list(COLOR_WEIGHTS.values()), k=size)
+    results = {}
+    for index, color in enumerate(colors):
+        host = f"SRV{index:06d}"
+        pinging = color != 'red'
+        reverse = {'green': f"{host.lower()}.domain.biz", 'yellow': f"{host.lower()}.domain.biz",
+                   'orange': f"outro{index}.domain.biz", 'red': None}[color]
+        ip = f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+        results[host] = (host, host if pinging else None, reverse, str(pinging), ip if pinging else 'Não resolvido',
+                         '128' if pinging else 'Erro ao pingar', 'Windows' if pinging else 'Não encontrado',
+                         False, color == 'green', 'Sede', 'A', '1', '101', 'Não', '', 'RDP' if color == 'green' else '')
+    return results
+
+
+def current_rss_mb():
+    """Memória residente (MB) do processo, incluindo a usada pelo Tk (None se indisponível)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024  # Pico, na falta do valor atual
+    except ImportError:
+        return None
+
+
+def percentile(values, fraction):
+    """Percentil (0 a 1) dos valores."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def start_xvfb():
+    """Inicia um Xvfb e define o DISPLAY (retorna o processo, ou None se o Xvfb não estiver instalado)."""
+    if not shutil.which('Xvfb'):
+        return None
+    process = subprocess.Popen(['Xvfb', XVFB_DISPLAY, '-screen', '0', '1280x1024x24', '-nolisten', 'tcp'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(0.5)  # Aguarda o servidor aceitar conexões
+    os.environ['DISPLAY'] = XVFB_DISPLAY
+    return process
+
+
+def silence_dialogs(hostflow):
+    """Substitui as caixas de diálogo e o navegador por versões que não bloqueiam o benchmark."""
+    import webbrowser
+    messages = []
+    hostflow.messagebox = types.SimpleNamespace(
+        showinfo=lambda *args, **kwargs: messages.append(args),
+        showwarning=lambda *args, **kwargs: messages.append(args),
+        showerror=lambda *args, **kwargs: messages.append(args),
+        askyesno=lambda *args, **kwargs: False)
+    webbrowser.open = lambda url, *args, **kwargs: True
+    return messages
+
+
+class FrameMonitor:
+    """Mede o atraso de um temporizador periódico do Tk, que indica quanto o laço principal ficou travado."""
+
+    def __init__(self, app, interval=FRAME_INTERVAL):
+        self.app = app
+        self.interval = interval
+        self.delays = []
+        self.expected = None
+        self.after_id = None
+
+    def start(self):
+        self.delays = []
+        self.expected = time.perf_counter() + self.interval / 1000
+        self.after_id = self.app.after(self.interval, self.tick)
+
+    def tick(self):
+        now = time.perf_counter()
+        self.delays.append(max(0.0, now - self.expected) * 1000)
+        self.expected = now + self.interval / 1000
+        self.after_id = self.app.after(self.interval, self.tick)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.app.after_cancel(self.after_id)
+            self.after_id = None
+
+
+def run_size(hostflow, size, timeout, seed):
+    """Executa o benchmark com uma lista de size hosts e retorna as métricas."""
+    app = hostflow.app
+    results = synthetic_results(size, seed)
+    metrics = {'size': size}
+    rss_before = current_rss_mb()
+    hostflow.MAX_HOSTS = max(hostflow.MAX_HOSTS, size)  # Permite medir listas acima do limite da interface
+
+    # Análise sintética: o resultado pronto vai direto para a fila, como se a varredura fosse instantânea
+    def synthetic_analyze_host(host, inventory, result_queue, job=None):
+        result = results[host]
+        result_queue.put(result)
+        return result
+    hostflow.analyze_host = synthetic_analyze_host
+
+    # Carga da lista pela área de transferência, como no uso normal (Ctrl+V)
+    started = {}
+    analyze_hosts = hostflow.analyze_hosts
+
+    def timed_analyze_hosts(sample=None):
+        started['apply'] = time.perf_counter()
+        analyze_hosts(sample)
+    hostflow.analyze_hosts = timed_analyze_hosts
+    app.clipboard_clear()
+    app.clipboard_append('\n'.join(results))
+    begin = time.perf_counter()
+    hostflow.paste_and_analyze()
+    app.update_idletasks()
+    metrics['load_s'] = time.perf_counter() - begin
+    hostflow.analyze_hosts = analyze_hosts
+
+    # Inundação de resultados: mede o atraso dos quadros até todos os resultados aparecerem na tabela
+    monitor = FrameMonitor(app)
+    outcome = {}
+
+    def watch():
+        if 'apply' in started and hostflow.progress['value'] >= size:
+            outcome['apply_s'] = time.perf_counter() - started['apply']
+            app.quit()
+        elif time.perf_counter() - begin > timeout:
+            outcome['timeout'] = True
+            app.quit()
+        else:
+            app.after(WATCH_INTERVAL, watch)
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):  # Descarta as mensagens de depuração
+        monitor.start()
+        app.after(WATCH_INTERVAL, watch)
+        app.mainloop()
+        monitor.stop()
+        hostflow.cancel_scan()
+    metrics['apply_s'] = outcome.get('apply_s')
+    metrics['timeout'] = outcome.get('timeout', False)
+    metrics['frames'] = len(monitor.delays)
+    metrics['frame_p50_ms'] = percentile(monitor.delays, 0.5)
+    metrics['frame_p95_ms'] = percentile(monitor.delays, 0.95)
+    metrics['frame_p99_ms'] = percentile(monitor.delays, 0.99)
+    metrics['frame_max_ms'] = max(monitor.delays, default=0.0)
+
+    # Operações sobre a tabela cheia
+    for name, operation in (('sort_s', hostflow.organize_by_color), ('report_s', hostflow.extract_report)):
+        begin = time.perf_counter()
+        operation()
+        app.update_idletasks()
+        metrics[name] = time.perf_counter() - begin
+
+    hostflow.checkbox_vars['red'].set(False)  # Oculta uma das categorias
+    begin = time.perf_counter()
+    hostflow.update_table_visibility()
+    app.update_idletasks()
+    metrics['filter_s'] = time.perf_counter() - begin
+    hostflow.checkbox_vars['red'].set(True)
+
+    rss_after = current_rss_mb()
+    metrics['rss_mb'] = rss_after
+    metrics['rss_delta_mb'] = rss_after - rss_before if rss_after is not None and rss_before is not None else None
+
+    # Limpa a tabela para a próxima quantidade (inclusive as linhas ocultas pelo filtro, que get_children omite)
+    hostflow.clear_rows()
+    hostflow.hosts_list = []
+    app.update()
+    return metrics
+
+
+def format_value(value, digits=3):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f"{value:.{digits}f}"
+    return str(value)
+
+
+def print_metrics(all_metrics):
+    """Mostra as métricas em uma tabela (uma linha por quantidade de hosts)."""
+    header = ('size', 'load_s', 'apply_s', 'frame_p50_ms', 'frame_p95_ms', 'frame_max_ms', 'sort_s', 'filter_s',
+              'report_s', 'rss_mb')
+    print('  '.join(f"{name:>12}" for name in header))
+    for metrics in all_metrics:
+        row = '  '.join(f"{format_value(metrics.get(name)):>12}" for name in header)
+        print(row + ('  (tempo esgotado)' if metrics.get('timeout') else ''))
+
+
+def compare_with_baseline(all_metrics, baseline, tolerance):
+    """Lista as métricas que pioraram mais que a tolerância em relação à referência."""
+    reference = {metrics['size']: metrics for metrics in baseline}
+    regressions = []
+    for metrics in all_metrics:
+        previous = reference.get(metrics['size'])
+        if previous is None:
+            continue
+        if metrics.get('timeout') and not previous.get('timeout'):
+            regressions.append(f"{metrics['size']} hosts: tempo esgotado")
+        for name in COMPARED_METRICS:
+            value, old = metrics.get(name), previous.get(name)
+            if value is not None and old and value > old * (1 + tolerance):
+                regressions.append(f"{metrics['size']} hosts: {name} {old:.3f} -> {value:.3f} "
+                                   f"(+{(value / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de responsividade da interface do HostFlow.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Quantidades de hosts (padrão: %(default)s)")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help="Tempo máximo (segundos) por quantidade (padrão: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="Semente dos resultados sintéticos")
+    parser.add_argument('--hidden', action='store_true',
+                        help="Mantém a janela oculta (não mede o desenho da tabela; o Tk ainda precisa de um DISPLAY)")
+    parser.add_argument('--json', help="Grava as métricas neste arquivo JSON")
+    parser.add_argument('--baseline', help="Arquivo JSON de uma execução anterior para comparação")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Piora relativa tolerada na comparação (padrão: %(default)s)")
+    args = parser.parse_args()
+
+    xvfb = None
+    if not os.environ.get('DISPLAY') and sys.platform.startswith('linux'):
+        xvfb = start_xvfb()
+        if xvfb is None:
+            parser.error("Nenhum DISPLAY disponível e o Xvfb não está instalado.")
+
+    # Executa em um diretório temporário: o diário, o inventário e o relatório não afetam os arquivos reais
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, package_dir)
+    work_dir = tempfile.mkdtemp(prefix='hostflow-bench-')
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        import HostFlow as hostflow
+        from hostflow_core import INVENTORY_FILE
+        with open(INVENTORY_FILE, 'w', encoding='utf-8') as inventory:
+            inventory.write('Código;Local;Prédio;Andar;Escritório;Obsoleto;Anotação\n')
+        silence_dialogs(hostflow)
+        hostflow.build_app()
+        if args.hidden:
+            hostflow.app.withdraw()
+        hostflow.app.update()
+
+        all_metrics = []
+        for size in args.sizes:
+            print(f"Executando com {size} hosts...", file=sys.stderr)
+            all_metrics.append(run_size(hostflow, size, args.timeout, args.seed))
+        hostflow.on_closing()
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if xvfb is not None:
+            xvfb.terminate()
+
+    print_metrics(all_metrics)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(all_metrics, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare_with_baseline(all_metrics, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regressão: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import ipaddress
+import threading
+import time
+
+# ========================================================================
+# Orçamentos de tempo e tempos limite adaptativos do HostFlow
+# Cada host recebe um prazo total (Deadline) dividido entre as etapas da
+# análise (ping, DNS e sondas). Os tempos limite de cada etapa são
+# aprendidos a partir dos RTTs observados em cada sub-rede, no estilo do
+# cálculo de RTO do TCP (RFC 6298).
+# ========================================================================
+
+# Prazo total (segundos) para a análise de um host
+HOST_DEADLINE = 12.0
+# Tempo limite (segundos) usado enquanto não há RTTs observados
+DEFAULT_TIMEOUT = 2.0
+# Limites (segundos) para os tempos limite adaptativos
+MIN_TIMEOUT = 0.3
+MAX_TIMEOUT = 5.0
+# Multiplicador aplicado ao RTT suavizado
+RTT_MULTIPLIER = 3
+# Tamanho dos prefixos usados para agrupar os RTTs por sub-rede
+IPV4_SUBNET_PREFIX = 24
+IPV6_SUBNET_PREFIX = 64
+
+
+class StageTimeout(Exception):
+    """Etapa interrompida pelo tempo limite (não é uma resposta definitiva e não deve ir para o cache).
+
+    result é o valor a usar no lugar da resposta.
+    """
+
+    def __init__(self, result):
+        super().__init__(result)
+        self.result = result
+
+
+class Deadline:
+    """Prazo absoluto para a análise de um host, dividido entre as etapas."""
+
+    def __init__(self, seconds=HOST_DEADLINE):
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self):
+        """Tempo restante (segundos) até o prazo."""
+        return max(0.0, self.expires - time.monotonic())
+
+    def expired(self):
+        """Indica se o prazo já terminou."""
+        return self.remaining() <= 0
+
+    def budget(self, share, timeout=None):
+        """Tempo disponível para uma etapa: a fração share do tempo restante, limitada a timeout."""
+        budget = self.remaining() * share
+        return budget if timeout is None else min(budget, timeout)
+
+
+def subnet_key(ip):
+    """Retorna a sub-rede usada para agrupar os RTTs do IP (ou None se não for um IP)."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    prefix = IPV4_SUBNET_PREFIX if address.version == 4 else IPV6_SUBNET_PREFIX
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class RttEstimator:
+    """Mantém o RTT suavizado (SRTT) e sua variação (RTTVAR) por chave (sub-rede, servidor DNS...)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._estimates = {}  # chave -> [srtt, rttvar]
+
+    def observe(self, key, rtt):
+        """Registra um RTT (segundos) observado para a chave."""
+        with self._lock:
+            estimate = self._estimates.get(key)
+            if estimate is None:
+                self._estimates[key] = [rtt, rtt / 2]
+            else:
+                srtt, rttvar = estimate
+                estimate[1] = 0.75 * rttvar + 0.25 * abs(srtt - rtt)
+                estimate[0] = 0.875 * srtt + 0.125 * rtt
+
+    def back_off(self, key, timeout):
+        """Registra uma operação sem resposta após timeout segundos: o próximo tempo limite ao menos dobra."""
+        with self._lock:
+            estimate = self._estimates.setdefault(key, [timeout, timeout / 2])
+            estimate[0] = max(estimate[0], 2 * timeout / RTT_MULTIPLIER)
+
+    def timeout(self, key, default=DEFAULT_TIMEOUT):
+        """Tempo limite adaptativo para a chave: RTT_MULTIPLIER * SRTT + 4 * RTTVAR, dentro dos limites."""
+        with self._lock:
+            if key not in self._estimates:
+                return default
+            srtt, rttvar = self._estimates[key]
+        return max(MIN_TIMEOUT, min(MAX_TIMEOUT, RTT_MULTIPLIER * srtt + 4 * rttvar))
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from deadline import MAX_TIMEOUT, StageTimeout
+from hostflow_core import dns_cache, get_inventory, inflight, resolve_dns
+
+# ========================================================================
+# Pré-carregamento de DNS em segundo plano do HostFlow
+# Resolve antecipadamente (registros diretos e reversos) os hosts do
+# inventário e suas variantes com 'x', dentro de um limite de consultas por
+# segundo. Os resultados ficam no cache por uma validade própria, maior que a
+# das consultas das varreduras; cada passagem completa pelo inventário só é
+# repetida quando essa validade está perto de terminar. Assim a primeira
+# varredura do dia já encontra o cache de DNS aquecido.
+# ========================================================================
+
+# Limite de consultas de DNS por segundo (cada host consome uma consulta direta e uma reversa)
+PREFETCH_QUERY_RATE = 10
+# Consultas de DNS feitas por host resolvido (direta + reversa)
+QUERIES_PER_LOOKUP = 2
+# Validade (segundos) das entradas pré-carregadas; uma passagem deve caber em
+# PREFETCH_TTL * (1 - REFRESH_FRACTION) segundos (com 10 consultas/s, cerca de 13.500 hosts)
+PREFETCH_TTL = 3600
+# Tempo limite (segundos) das consultas do pré-carregamento (fixo, sem o ajuste adaptativo das varreduras)
+PREFETCH_TIMEOUT = MAX_TIMEOUT
+# Entradas com menos que esta fração da própria validade restante são renovadas na próxima passagem
+# (a validade é a da entrada: PREFETCH_TTL no pré-carregamento, DNS_CACHE_TTL nas varreduras)
+REFRESH_FRACTION = 0.25
+# Espera (segundos) entre as verificações enquanto há uma varredura em andamento
+IDLE_INTERVAL = 5.0
+
+
+def prefetch_hosts(inventory):
+    """Hosts a pré-carregar: cada código do inventário e sua variante com 'x' (como em analyze_host)."""
+    hosts = []
+    for code in inventory:
+        code = code.strip()
+        if code:
+            hosts.append(code)
+            hosts.append(code + 'x')
+    return hosts
+
+
+class DNSPrefetcher:
+    """Thread de baixa prioridade que mantém o cache de DNS aquecido com os hosts do inventário."""
+
+    def __init__(self, query_rate=PREFETCH_QUERY_RATE, busy=None, ttl=PREFETCH_TTL):
+        self.query_rate = query_rate
+        self.ttl = ttl
+        self.busy = busy  # Função que indica uma varredura em andamento (o pré-carregamento aguarda)
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.resolved = 0
+        self.failed = 0
+
+    def start(self):
+        """Inicia o pré-carregamento em segundo plano."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='dns-prefetch', daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        """Interrompe o pré-carregamento (sem aguardar a consulta em andamento)."""
+        self.stop_event.set()
+
+    def _is_stale(self, host):
+        """Indica se o host não está no cache ou se a entrada está perto de expirar (em relação à sua validade)."""
+        return (dns_cache.remaining_fraction(('dns', host.lower())) or 0) < REFRESH_FRACTION
+
+    def _run(self):
+        interval = QUERIES_PER_LOOKUP / self.query_rate  # Espaçamento entre as consultas
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            try:
+                hosts = prefetch_hosts(get_inventory())
+            except (OSError, KeyError):
+                hosts = []
+            for host in hosts:
+                while self.busy and self.busy():
+                    if self.stop_event.wait(IDLE_INTERVAL):  # Não disputa o servidor DNS com a varredura
+                        return
+                if self.stop_event.is_set():
+                    return
+                # A varredura (ou a passagem anterior) pode já ter resolvido o host
+                if self._is_stale(host):
+                    self._prefetch(host)
+                    if self.stop_event.wait(interval):
+                        return
+            # Passagem concluída: aguarda até que as entradas pré-carregadas estejam perto de expirar
+            next_pass = started + self.ttl * (1 - REFRESH_FRACTION)
+            self.stop_event.wait(max(IDLE_INTERVAL, next_pass - time.monotonic()))
+
+    def _prefetch(self, host):
+        """Resolve o host e guarda o resultado com a validade do pré-carregamento (falhas não são guardadas)."""
+        key = ('dns', host.lower())
+        try:
+            # Consultas simultâneas da varredura ao mesmo host são compartilhadas
+            addresses, reverse_host = inflight.do(key, lambda: resolve_dns(host, timeout=PREFETCH_TIMEOUT))
+        except StageTimeout:
+            addresses = None
+        if addresses:
+            dns_cache.put(key, (addresses, reverse_host), ttl=self.ttl)
+            self.resolved += 1
+        else:
+            self.failed += 1  # Sem resposta ou nome inexistente: a varredura faz a própria consulta
@@ -0,0 +1,429 @@
+import socket
+import re
+import ipaddress
+import os
+import threading
+import time
+from probes import DEFAULT_PROBES, interleave_addresses, run_probes
+from single_flight import SingleFlight
+from deadline import Deadline, RttEstimator, StageTimeout, subnet_key
+from ttl_cache import TTLCache
+from ip_set import IPSet, read_ip_set
+
+# ========================================================================
+# Núcleo de análise do HostFlow
+# Funções de ping, DNS, sondas de serviço e classificação, sem dependência
+# da interface gráfica. Usado pelo HostFlow (Tk) e pelo serviço HTTP.
+# Módulos pesados (subprocess, csv, concurrent.futures) são importados apenas
+# quando usados, para que a janela principal abra rapidamente.
+# ========================================================================
+
+# Defina o número máximo de hosts permitidos
+MAX_HOSTS = 50000  # Listas grandes podem ser estimadas por amostragem antes da varredura completa
+# Limite de threads em uso
+MAX_THREADS = 300  # 11 por segundo com 300 threads simultâneas
+# Limites de TTL para determinar o sistema operacional
+TTL_MIN_LINUX = 1
+TTL_MAX_LINUX = 100
+TTL_MIN_WINDOWS = 101
+TTL_MAX_WINDOWS = 255
+# Fração do tempo restante do host destinada a cada ping e à resolução de DNS (as sondas usam o restante)
+PING_SHARE = 0.25
+DNS_SHARE = 0.4
+# Margem (segundos) para a inicialização do processo do ping além do tempo limite
+PING_STARTUP_MARGIN = 1.0
+# Threads dedicadas às consultas de DNS (permitem abandonar consultas que excedem o prazo)
+DNS_THREADS = 50
+# Validade (segundos) dos resultados em cache
+DNS_CACHE_TTL = 300
+PING_CACHE_TTL = 30
+PROBE_CACHE_TTL = 30
+# Arquivo de inventário
+INVENTORY_FILE = 'inventário.csv'  # Altere para o caminho correto se necessário
+# Listas opcionais de faixas de IPs (um IP, rede CIDR ou faixa "início-fim" por linha):
+# se o arquivo de escopo existir, apenas as faixas listadas são analisadas; as exclusões nunca são analisadas
+SCOPE_FILE = 'escopo.txt'
+EXCLUSIONS_FILE = 'exclusões.txt'
+# Intervalo mínimo (segundos) entre verificações de modificação das listas de escopo e de exclusão
+SCOPE_CHECK_INTERVAL = 2.0
+# Erros de DNS que são respostas definitivas (nome ou registro inexistente) e podem ser guardados em cache;
+# os demais (como EAI_AGAIN e TRY_AGAIN) são falhas temporárias do servidor e não são guardados
+DEFINITIVE_DNS_ERRORS = {getattr(socket, name) for name in ('EAI_NONAME', 'EAI_NODATA') if hasattr(socket, name)}
+# Códigos h_errno de socket.herror definitivos no DNS reverso: HOST_NOT_FOUND (1) e NO_DATA (4)
+DEFINITIVE_REVERSE_ERRORS = {1, 4}
+# Resultado do ping de hosts fora do escopo (não pingados)
+OUT_OF_SCOPE = (False, 'Fora do escopo')
+# Padrão de nomes de host válidos
+HOSTNAME_PATTERN = re.compile(r'^[a-zA-Z0-9.-]+$')
+
+# Colunas do resultado de analyze_host (na ordem da tupla)
+COLUMNS = ("Host", "Host Pingando", "DNS Reverso", "Ping", "IP", "TTL", "SO", "SSH Aberta", "RDP Aberta",
+           "Local", "Prédio", "Andar", "Escritório", "Obsoleto", "Anotação", "Serviços")
+
+# Operações de rede em andamento (ping, DNS e sondas), compartilhadas entre hosts repetidos
+inflight = SingleFlight()
+# RTTs observados por sub-rede, usados nos tempos limite adaptativos
+rtt_estimator = RttEstimator()
+# Executor das consultas de DNS (criado na primeira consulta; veja get_dns_executor)
+dns_executor = None
+dns_executor_lock = threading.Lock()
+# Vagas do executor de DNS (liberadas apenas quando a consulta termina, mesmo se abandonada)
+dns_slots = threading.BoundedSemaphore(DNS_THREADS)
+# Caches compartilhados entre as varreduras
+dns_cache = TTLCache(DNS_CACHE_TTL)
+ping_cache = TTLCache(PING_CACHE_TTL)
+probe_cache = TTLCache(PROBE_CACHE_TTL)
+# Inventário carregado: (caminho, data de modificação, conteúdo)
+inventory_cache = None
+# Listas de escopo e de exclusão carregadas: caminho -> (verificado em, data de modificação, IPSet ou None)
+ip_list_cache = {}
+
+def is_valid_host(host):
+    """Verifica se o host é um IP (dentro do escopo) ou um nome de host válido."""
+    try:
+        ipaddress.ip_address(host)  # Valida se é um IP
+    except ValueError:
+        return bool(HOSTNAME_PATTERN.match(host))
+    return in_scope(host)
+
+def get_ip_list(file_path):
+    """Retorna o IPSet do arquivo de faixas (ou None se ele não existir), relendo-o apenas quando modificado."""
+    now = time.monotonic()
+    entry = ip_list_cache.get(file_path)
+    if entry is not None and now - entry[0] < SCOPE_CHECK_INTERVAL:
+        return entry[2]
+    try:
+        modified = os.path.getmtime(file_path)
+    except OSError:
+        modified = None
+    if entry is None or entry[1] != modified:
+        ip_set = read_ip_set(file_path) if modified is not None else None
+    else:
+        ip_set = entry[2]
+    ip_list_cache[file_path] = (now, modified, ip_set)
+    return ip_set
+
+def in_scope(address):
+    """Verifica se o IP pode ser analisado, segundo as listas de escopo e de exclusão."""
+    scope = get_ip_list(SCOPE_FILE)
+    exclusions = get_ip_list(EXCLUSIONS_FILE)
+    if scope is not None and address not in scope:
+        return False
+    return not (exclusions and address in exclusions)
+
+def scope_restricted():
+    """Indica se há uma lista de escopo ou de exclusão em uso."""
+    return get_ip_list(SCOPE_FILE) is not None or bool(get_ip_list(EXCLUSIONS_FILE))
+
+def ping_target(host, deadline=None):
+    """Destino do ping do host: o próprio host, um endereço resolvido dentro do escopo ou None (fora do escopo)."""
+    if subnet_key(host):
+        return host if in_scope(host) else None
+    if not scope_restricted():
+        return host
+    # Resolve antes de pingar: nomes que apontam para faixas excluídas não recebem ICMP.
+    # Sem uma resposta definitiva (tempo esgotado ou nome inexistente) o host é tratado como fora do escopo,
+    # pois o resolvedor do sistema poderia levar o ping a uma faixa excluída
+    addresses, _ = dns_lookup(host, deadline)
+    allowed = [address for address in addresses if in_scope(address)]
+    if addresses and len(allowed) == len(addresses):
+        return host
+    return allowed[0] if allowed else None
+
+def unique_hosts(hosts):
+    """Remove os hosts repetidos (IPs em qualquer notação e nomes sem diferenciar maiúsculas), mantendo a ordem."""
+    seen_addresses = IPSet()
+    seen_names = set()
+    unique = []
+    for host in hosts:
+        try:
+            new = seen_addresses.add(host)
+        except ValueError:
+            name = host.lower()
+            new = name not in seen_names
+            seen_names.add(name)
+        if new:
+            unique.append(host)
+    return unique
+
+def get_dns_executor():
+    """Retorna o executor das consultas de DNS, criando-o na primeira utilização."""
+    global dns_executor
+    with dns_executor_lock:
+        if dns_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            dns_executor = ThreadPoolExecutor(max_workers=DNS_THREADS)
+        return dns_executor
+
+def shutdown_engine():
+    """Encerra as threads do motor de análise (sem aguardar as consultas em andamento)."""
+    if dns_executor is not None:
+        dns_executor.shutdown(wait=False)
+
+def cached(cache, key, fn, job=None):
+    """Retorna o resultado em cache ou executa fn() uma única vez entre os chamadores simultâneos."""
+    value = cache.get(key)
+    if value is None:
+        try:
+            value = inflight.do(key, fn, job)
+        except StageTimeout as e:
+            return e.result  # Tempo esgotado: não é guardado, a próxima consulta tenta novamente
+        if not (job and job.is_cancelled()):  # Resultados de sondas abortadas não são guardados
+            cache.put(key, value)
+    return value
+
+def ping(host, job=None, deadline=None):
+    """Realiza um ping no host e retorna o resultado e TTL (pings simultâneos ao mesmo host são compartilhados)."""
+    return cached(ping_cache, ('ping', host.lower()), lambda: execute_ping(host, job, deadline), job)
+
+def execute_ping(host, job=None, deadline=None):
+    """Executa o comando ping e retorna o resultado e TTL."""
+    import math
+    import platform
+    import subprocess
+    # Tempo limite aprendido com os RTTs observados, limitado ao prazo do host
+    learned_timeout = rtt_estimator.timeout(subnet_key(host) or 'ping')
+    timeout = deadline.budget(PING_SHARE, learned_timeout) if deadline else learned_timeout
+    squeezed = timeout < learned_timeout  # Tempo reduzido pelo prazo do host: uma falha não é definitiva
+    if platform.system().lower() == 'windows':
+        command = ['ping', '-n', '1', '-w', str(max(1, int(timeout * 1000))), host]
+    else:
+        command = ['ping', '-c', '1', '-W', str(max(1, math.ceil(timeout))), host]
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   universal_newlines=True)
+    except OSError:
+        return False, 'Erro ao pingar'
+    if job:
+        job.register_abort(process.kill)  # Cancelar a varredura encerra o ping em andamento
+    try:
+        output, _ = process.communicate(timeout=timeout + PING_STARTUP_MARGIN)
+    except subprocess.TimeoutExpired:
+        process.kill()  # Ping travado: não prende a thread além do prazo
+        process.communicate()
+        raise StageTimeout((False, 'Erro ao pingar'))
+    finally:
+        if job:
+            job.unregister_abort(process.kill)
+    if process.returncode != 0:
+        if squeezed:
+            raise StageTimeout((False, 'Erro ao pingar'))
+        return False, 'Erro ao pingar'  # Retorna False se o ping falhar (ou for cancelado)
+    rtt_match = re.search(r'(?:time|tempo)[=<]\s*([\d.,]+)\s*ms', output, re.IGNORECASE)
+    if rtt_match:
+        rtt = float(rtt_match.group(1).replace(',', '.')) / 1000
+        rtt_estimator.observe('ping', rtt)
+        address_match = re.search(r'[\[(]([0-9a-fA-F:.]+)[\])]', output)  # IP que respondeu
+        if address_match and subnet_key(address_match.group(1)):
+            rtt_estimator.observe(subnet_key(address_match.group(1)), rtt)
+    ttl_match = re.search(r'TTL=(\d+)', output)
+    ttl = ttl_match.group(1) if ttl_match else 'Não encontrado'
+    return True, ttl  # Retorna True se o ping for bem-sucedido
+
+def dns_lookup(host, deadline=None):
+    """Realiza a resolução de DNS do host e retorna os endereços (IPv4/IPv6) e o hostname reverso."""
+    return cached(dns_cache, ('dns', host.lower()), lambda: resolve_dns(host, deadline))
+
+def dns_query(stage, fn, *args):
+    """Executa a consulta no executor de DNS dentro do prazo da etapa (FuturesTimeoutError se excedido).
+
+    Consultas abandonadas continuam ocupando uma vaga até terminarem; com todas as vagas ocupadas
+    (servidor DNS travado) nenhuma consulta nova é enfileirada.
+    """
+    from concurrent.futures import TimeoutError as FuturesTimeoutError
+    if not dns_slots.acquire(timeout=stage.remaining()):
+        raise FuturesTimeoutError()
+    try:
+        future = get_dns_executor().submit(fn, *args)
+    except BaseException:
+        dns_slots.release()
+        raise
+    future.add_done_callback(lambda _: dns_slots.release())
+    return future.result(timeout=stage.remaining())
+
+def resolve_dns(host, deadline=None, timeout=None):
+    """Consulta os registros A/AAAA e o DNS reverso do host, respeitando o tempo limite da etapa.
+
+    timeout substitui o tempo limite aprendido com os RTTs (usado pelo pré-carregamento de DNS).
+    """
+    from concurrent.futures import TimeoutError as FuturesTimeoutError
+    learned_timeout = rtt_estimator.timeout('dns') if timeout is None else timeout
+    timeout = deadline.budget(DNS_SHARE, learned_timeout) if deadline else learned_timeout
+    stage = Deadline(timeout)
+    started = time.monotonic()
+    try:
+        infos = dns_query(stage, socket.getaddrinfo, host, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
+        rtt_estimator.observe('dns', time.monotonic() - started)
+    except UnicodeError:
+        return [], None  # Nome inválido: resposta definitiva
+    except socket.gaierror as e:
+        if e.errno not in DEFINITIVE_DNS_ERRORS:
+            raise StageTimeout(([], None))  # Falha temporária do servidor: não é guardada
+        rtt_estimator.observe('dns', time.monotonic() - started)
+        return [], None  # Nome inexistente: resposta definitiva
+    except FuturesTimeoutError:
+        if timeout >= learned_timeout:
+            rtt_estimator.back_off('dns', timeout)  # Sem resposta no tempo aprendido: aumenta o tempo limite
+        raise StageTimeout(([], None))
+    addresses = interleave_addresses([info[4][0] for info in infos])
+    try:
+        reverse_host = dns_query(stage, socket.gethostbyaddr, addresses[0])
+        return addresses, reverse_host[0]
+    except socket.herror as e:
+        if e.errno not in DEFINITIVE_REVERSE_ERRORS:
+            raise StageTimeout((addresses, None))
+        return addresses, None  # Sem registro reverso: resposta definitiva
+    except socket.gaierror as e:
+        if e.errno not in DEFINITIVE_DNS_ERRORS:
+            raise StageTimeout((addresses, None))
+        return addresses, None
+    except FuturesTimeoutError:
+        raise StageTimeout((addresses, None))
+
+def probe_services(addresses, probes=None, job=None, deadline=None):
+    """Executa as sondas de serviço no host (sondas simultâneas aos mesmos endereços são compartilhadas)."""
+    addresses = [addresses] if isinstance(addresses, str) else list(addresses)
+    probes = DEFAULT_PROBES if probes is None else probes
+    key = ('probes', tuple(addresses), tuple((probe.name, probe.port) for probe in probes))
+    return cached(probe_cache, key, lambda: execute_probes(addresses, probes, job, deadline), job)
+
+def execute_probes(addresses, probes, job=None, deadline=None):
+    """Executa as sondas com o tempo limite das sub-redes e registra os RTTs observados."""
+    timeout = max(rtt_estimator.timeout(subnet_key(address)) for address in addresses)
+    if deadline:
+        timeout = deadline.budget(1.0, timeout)
+    results = run_probes(addresses, probes, timeout, job, deadline.expires if deadline else None)
+    for result in results.values():
+        if result.rtt is not None:
+            rtt_estimator.observe(subnet_key(result.address), result.rtt)
+    return results
+
+def answering_address(addresses, services):
+    """Endereço que aceitou as conexões (ou o preferido, se nenhum aceitou)."""
+    for result in services.values():
+        if result.open and result.address:
+            return result.address
+    return addresses[0] if addresses else None
+
+def describe_services(services):
+    """Resume as sondas de serviço abertas em um texto para a tabela."""
+    return ' | '.join(result.detail or result.name for result in services.values() if result.open)
+
+def get_os(ttl):
+    """Determina o sistema operacional baseado no TTL."""
+    if ttl != 'Não encontrado':
+        ttl_value = int(ttl)
+        if TTL_MIN_LINUX <= ttl_value <= TTL_MAX_LINUX:
+            return 'Linux'
+        elif TTL_MIN_WINDOWS <= ttl_value <= TTL_MAX_WINDOWS:
+            return 'Windows'
+    return 'Desconhecido'
+
+def read_inventory(file_path):
+    """Lê o arquivo CSV e retorna um dicionário com as informações (FileNotFoundError/KeyError em caso de erro)."""
+    import csv
+    inventory = {}
+    with open(file_path, newline='', encoding='utf-8-sig') as csvfile:
+        reader = csv.DictReader(csvfile, delimiter=';')
+        for row in reader:
+            code = row['Código']  # A chave deve corresponder ao cabeçalho
+            inventory[code] = row
+    return inventory
+
+def get_inventory(file_path=INVENTORY_FILE):
+    """Retorna o inventário, relendo o arquivo apenas quando ele é modificado."""
+    global inventory_cache
+    modified = os.path.getmtime(file_path)
+    if inventory_cache is None or inventory_cache[:2] != (file_path, modified):
+        inventory_cache = (file_path, modified, read_inventory(file_path))
+    return inventory_cache[2]
+
+def analyze_host(host, inventory, result_queue, job=None):
+    """Analisa um único host e coloca os resultados na fila."""
+    original_host = host
+    x_host = host + 'x'  # Cria o host com 'x' no final
+    deadline = Deadline()  # Prazo total da análise deste host, dividido entre as etapas
+
+    # Testa ambos os hosts (apenas os endereços dentro do escopo)
+    original_target = ping_target(original_host, deadline)
+    x_target = ping_target(x_host, deadline)
+    original_ping_result, original_ttl = ping(original_target, job, deadline) if original_target else OUT_OF_SCOPE
+    x_ping_result, x_ttl = ping(x_target, job, deadline) if x_target else OUT_OF_SCOPE
+    if job and job.is_cancelled():
+        return  # Varredura cancelada: descarta o resultado parcial
+
+    # Determina qual host está pingando
+    pinging_host = original_host if original_ping_result else x_host if x_ping_result else None
+
+    # Determina informações adicionais
+    if pinging_host:
+        addresses, reverse_host = dns_lookup(pinging_host, deadline)
+        os_name = get_os(original_ttl if pinging_host == original_host else x_ttl)
+        localization_info = inventory.get(original_host, {})
+    else:
+        addresses, reverse_host = dns_lookup(original_host, deadline)  # Tenta resolver o DNS do original_host
+        os_name = 'Não encontrado'
+        localization_info = inventory.get(original_host, {})
+
+    # Nomes que resolvem para faixas fora do escopo (ou excluídas) não recebem as sondas de serviço
+    probe_addresses = [address for address in addresses if in_scope(address)]
+    # Executa as sondas de serviço (SSH, RDP, WinRM, HTTP...) em paralelo, disputando os endereços resolvidos
+    services = probe_services(probe_addresses, job=job, deadline=deadline) if probe_addresses else {}
+    # Exibe primeiro o endereço que respondeu, seguido dos demais (hosts com vários endereços)
+    ip = answering_address(addresses, services)
+    ip_list = ', '.join([ip] + [address for address in addresses if address != ip]) if ip else None
+    ssh_open = services['SSH'].open if 'SSH' in services else False
+    rdp_open = services['RDP'].open if 'RDP' in services else False
+    if job and job.is_cancelled():
+        return
+
+    # Coloca os resultados na fila
+    result = (original_host, pinging_host, reverse_host, 'True' if pinging_host else 'False',
+              ip_list or 'Não resolvido', original_ttl if pinging_host == original_host else x_ttl,
+              os_name, ssh_open, rdp_open,
+              localization_info.get('Local', 'Não encontrado'),
+              localization_info.get('Prédio', 'Não encontrado'),
+              localization_info.get('Andar', 'Não encontrado'),
+              localization_info.get('Escritório', 'Não encontrado'),
+              localization_info.get('Obsoleto', 'Não encontrado'),
+              localization_info.get('Anotação', 'Não encontrado'),
+              describe_services(services))
+    result_queue.put(result)
+    return result
+
+def classify_result(result):
+    """Determina a cor (categoria) do resultado de um host."""
+    # Variáveis para a lógica
+    SO = result[6]
+    RDP_Aberta = result[8]
+    SSH_Aberta = result[7]
+    DNS_Reverso = result[2]
+    HOST_PINGANDO = result[0]
+    reverso = (DNS_Reverso or '').lower()  # Hosts sem DNS reverso não podem ser comparados
+
+    # Lógica para determinar se a linha deve ficar vermelha ou verde
+    C_Windows_Acessivel_Remotamente = ((SO == "Windows") and
+                                       (reverso.replace('.domain.biz', '') == HOST_PINGANDO.lower())) and (
+                                              RDP_Aberta is True)
+    C_Windows_Sem_Acesso_Remoto = ((SO == "Windows") and
+                                   (reverso.replace('.domain.biz', '') == HOST_PINGANDO.lower())) and (
+                                          RDP_Aberta is False)
+
+    C_Linux_Acessivel_Remotamente = (SO == "Linux") and (
+            reverso.replace('x.domain.biz', '') == HOST_PINGANDO.lower()) and (
+                                            (RDP_Aberta is True) and (SSH_Aberta is True))
+    C_Linux_Sem_Acesso_Remotamente = (SO == "Linux") and (
+            reverso.replace('x.domain.biz', '') == HOST_PINGANDO.lower()) and (
+                                             (RDP_Aberta is False) and (SSH_Aberta is False))
+
+    Erro_DNS = (DNS_Reverso is not None) and not (
+            (reverso.replace('.domain.biz', '') == HOST_PINGANDO.lower()) or (
+            reverso.replace('x.domain.biz', '') == HOST_PINGANDO.lower()))
+
+    if C_Windows_Acessivel_Remotamente or C_Linux_Acessivel_Remotamente:
+        return 'green'
+    elif C_Windows_Sem_Acesso_Remoto or C_Linux_Sem_Acesso_Remotamente:
+        return 'yellow'
+    elif Erro_DNS:
+        return 'orange'
+    return 'red'
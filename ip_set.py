@@ -0,0 +1,201 @@
+import ipaddress
+import socket
+from array import array
+from bisect import bisect_left, bisect_right
+
+# ========================================================================
+# Conjunto compacto de endereços IP do HostFlow
+# Guarda faixas de IPs (IPv4 e IPv6) como intervalos inteiros ordenados e
+# mesclados, com busca binária. Endereços isolados ficam fora dos intervalos,
+# agrupados por bloco em vetores de deslocamentos de 16 bits; blocos com
+# muitos endereços isolados passam a ser guardados em um mapa de bits. Assim
+# incluir um endereço isolado não desloca as listas de intervalos. Usado para remover alvos repetidos e para as listas de escopo
+# e de exclusão.
+# ========================================================================
+
+# Deslocamento aplicado aos endereços IPv6, para que não se misturem com os IPv4
+IPV6_OFFSET = 1 << 32
+# Tamanho (bits de endereço) dos blocos que podem ser convertidos em mapa de bits (/16 no IPv4)
+BLOCK_BITS = 16
+# Quantidade de endereços isolados em um bloco a partir da qual ele passa a ser um mapa de bits
+BITMAP_THRESHOLD = 256
+
+
+def ip_key(address):
+    """Converte o IP (texto ou objeto ipaddress) no inteiro usado pelo conjunto (ValueError se inválido)."""
+    if isinstance(address, str):
+        try:
+            return int.from_bytes(socket.inet_pton(socket.AF_INET, address), 'big')  # Caminho rápido do IPv4
+        except OSError:
+            pass
+        if ':' in address and '%' not in address:
+            try:
+                return int.from_bytes(socket.inet_pton(socket.AF_INET6, address), 'big') + IPV6_OFFSET
+            except OSError:
+                pass
+        address = ipaddress.ip_address(address)
+    return int(address) if address.version == 4 else int(address) + IPV6_OFFSET
+
+
+def parse_range(text):
+    """Converte um IP, uma rede (CIDR) ou uma faixa "início-fim" no intervalo de inteiros (primeiro, último)."""
+    text = text.strip()
+    if '-' in text:
+        first, last = (ipaddress.ip_address(part.strip()) for part in text.split('-', 1))
+        if first.version != last.version or first > last:
+            raise ValueError(f"Faixa de IPs inválida: {text}")
+        return ip_key(first), ip_key(last)
+    if '/' in text:
+        network = ipaddress.ip_network(text, strict=False)
+        return ip_key(network.network_address), ip_key(network.broadcast_address)
+    key = ip_key(text)
+    return key, key
+
+
+class IPSet:
+    """Conjunto de endereços IP com inclusão e consulta em O(log n)."""
+
+    def __init__(self, entries=()):
+        self._starts = []  # Início de cada intervalo (ordenados, sem sobreposição nem adjacência)
+        self._ends = []  # Fim (inclusive) de cada intervalo
+        self._bitmaps = {}  # bloco -> bytearray com um bit por endereço
+        self._bit_counts = {}  # bloco -> quantidade de bits marcados
+        self._singles = {}  # bloco -> array('H') com os deslocamentos dos endereços isolados
+        for entry in entries:
+            self.add_range(entry)
+
+    def add(self, address):
+        """Inclui um IP; retorna False se ele já pertencia ao conjunto (ValueError se inválido)."""
+        return self.add_key(ip_key(address))
+
+    def add_key(self, key):
+        """Inclui o inteiro (veja ip_key); retorna False se ele já pertencia ao conjunto."""
+        block = key >> BLOCK_BITS
+        offset = key - (block << BLOCK_BITS)
+        bitmap = self._bitmaps.get(block)
+        if bitmap is not None:
+            mask = 1 << (offset & 7)
+            if bitmap[offset >> 3] & mask or self._in_intervals(key):
+                return False
+            bitmap[offset >> 3] |= mask
+            self._bit_counts[block] += 1
+            return True
+        singles = self._singles.get(block)
+        if singles is not None and offset in singles:  # No máximo BITMAP_THRESHOLD deslocamentos
+            return False
+        if self._starts and self._in_intervals(key):
+            return False
+        if singles is None:
+            self._singles[block] = array('H', (offset,))
+        else:
+            singles.append(offset)
+            if len(singles) >= BITMAP_THRESHOLD:
+                self._to_bitmap(block)
+        return True
+
+    def add_range(self, text):
+        """Inclui um IP, uma rede (CIDR) ou uma faixa "início-fim" (ValueError se inválido)."""
+        first, last = parse_range(text)
+        if first == last:
+            self.add_key(first)  # "10.0.0.5/32", "::1/128" e "a-a" são um único endereço
+            return
+        # Os endereços já incluídos na faixa passam a ser cobertos pelo intervalo
+        for block in self._blocks_within(self._bitmaps, first, last):
+            self._clear_bits(block, first, last)
+        for block in self._blocks_within(self._singles, first, last):
+            self._clear_singles(block, first, last)
+        self._insert(first, last)
+
+    def __contains__(self, address):
+        try:
+            key = ip_key(address)
+        except ValueError:
+            return False
+        return self.contains_key(key)
+
+    def contains_key(self, key):
+        """Verifica se o inteiro (veja ip_key) pertence ao conjunto."""
+        block = key >> BLOCK_BITS
+        offset = key - (block << BLOCK_BITS)
+        bitmap = self._bitmaps.get(block)
+        if bitmap is not None and bitmap[offset >> 3] & (1 << (offset & 7)):
+            return True
+        singles = self._singles.get(block)
+        if singles is not None and offset in singles:
+            return True
+        return self._in_intervals(key)
+
+    def __len__(self):
+        return (sum(end - start + 1 for start, end in zip(self._starts, self._ends))
+                + sum(self._bit_counts.values()) + sum(len(singles) for singles in self._singles.values()))
+
+    def __bool__(self):
+        return bool(self._starts or self._bitmaps or self._singles)
+
+    def _in_intervals(self, key):
+        """Busca binária nos intervalos."""
+        index = bisect_right(self._starts, key) - 1
+        return index >= 0 and self._ends[index] >= key
+
+    def _insert(self, first, last):
+        """Inclui o intervalo, mesclando-o com os intervalos sobrepostos ou adjacentes."""
+        starts, ends = self._starts, self._ends
+        i = bisect_left(ends, first - 1)
+        j = bisect_right(starts, last + 1)
+        if i < j:
+            first = min(first, starts[i])
+            last = max(last, ends[j - 1])
+        starts[i:j] = [first]
+        ends[i:j] = [last]
+
+    @staticmethod
+    def _blocks_within(blocks, first, last):
+        """Blocos do dicionário que se sobrepõem ao intervalo (uma rede IPv6 pode abranger 2^48 blocos ou mais)."""
+        first_block, last_block = first >> BLOCK_BITS, last >> BLOCK_BITS
+        if last_block - first_block < len(blocks):
+            return [block for block in range(first_block, last_block + 1) if block in blocks]
+        return [block for block in blocks if first_block <= block <= last_block]
+
+    def _to_bitmap(self, block):
+        """Converte os endereços isolados do bloco em um mapa de bits."""
+        singles = self._singles.pop(block)
+        bitmap = bytearray(1 << (BLOCK_BITS - 3))
+        for offset in singles:
+            bitmap[offset >> 3] |= 1 << (offset & 7)
+        self._bitmaps[block] = bitmap
+        self._bit_counts[block] = len(singles)
+
+    def _clear_bits(self, block, first, last):
+        """Desmarca os bits do bloco cobertos pelo intervalo (primeiro, último)."""
+        base = block << BLOCK_BITS
+        bitmap = self._bitmaps[block]
+        for offset in range(max(first, base) - base, min(last, base + (1 << BLOCK_BITS) - 1) - base + 1):
+            mask = 1 << (offset & 7)
+            if bitmap[offset >> 3] & mask:
+                bitmap[offset >> 3] &= ~mask
+                self._bit_counts[block] -= 1
+
+    def _clear_singles(self, block, first, last):
+        """Remove os endereços isolados do bloco cobertos pelo intervalo (primeiro, último)."""
+        base = block << BLOCK_BITS
+        low, high = first - base, last - base
+        remaining = array('H', (offset for offset in self._singles[block] if not low <= offset <= high))
+        if remaining:
+            self._singles[block] = remaining
+        else:
+            del self._singles[block]
+
+
+def read_ip_set(file_path):
+    """Lê um arquivo com um IP, rede (CIDR) ou faixa por linha (# inicia comentários) e retorna o IPSet."""
+    ip_set = IPSet()
+    with open(file_path, encoding='utf-8-sig') as file:
+        for line_number, line in enumerate(file, 1):
+            entry = line.split('#', 1)[0].strip()
+            if not entry:
+                continue
+            try:
+                ip_set.add_range(entry)
+            except ValueError:
+                print(f"{file_path}:{line_number}: entrada ignorada: {entry}")
+    return ip_set
@@ -1,13 +1,17 @@
 import tkinter as tk
-import subprocess
-import time
+import queue
 import threading
-import platform
+
+from deadline import StageTimeout
+from hostflow_core import execute_ping, ping_cache
+
+# Intervalo (ms) entre as atualizações da janela com os resultados da thread de ping
+POLL_INTERVAL = 100
 
 
 class PingApp:
     def __init__(self, master):
-        self.master = master
+        self.master = master  # Janela principal (Tk) ou janela do HostFlow (Toplevel)
         self.master.title("Ping Monitor")
 
         self.host_label = tk.Label(master, text="Host/IP:")
@@ -27,75 +31,88 @@ class PingApp:
 
         self.status_color = "gray"
         self.timeout = 5  # Tempo limite em segundos
+        self.interval = 1  # Intervalo entre pings em segundos
         self.ping_thread = None
+        self.stop_event = threading.Event()  # Interrompe a thread de ping (inclusive durante as esperas)
+        self.updates = queue.Queue()  # (cor, mensagem) enviados pela thread de ping
         self.running = False
+        self.poll_id = None
 
         self.update_circle()
+        self.poll_updates()
 
     def update_circle(self):
         self.canvas.delete("all")
         self.canvas.create_oval(50, 50, 150, 150, fill=self.status_color)
-        self.master.update()
+
+    def poll_updates(self):
+        """Aplica na janela os resultados enviados pela thread de ping (o Tk só é acessado nesta thread)."""
+        try:
+            while True:
+                color, log_message = self.updates.get_nowait()
+                self.status_color = color
+                self.update_circle()
+                self.log_text.insert(tk.END, log_message)
+                self.log_text.see(tk.END)  # Rola para o final do log
+        except queue.Empty:
+            pass
+        self.poll_id = self.master.after(POLL_INTERVAL, self.poll_updates)
 
     def start_stop_ping(self):
         if self.running:
             # Parar o ping
-            self.running = False
+            self.stop_ping()
             self.start_stop_button.config(text="Iniciar Ping")
         else:
             # Iniciar o ping
-            host = self.host_entry.get()
+            host = self.host_entry.get().strip()
             if host:
-                if self.ping_thread is not None and self.ping_thread.is_alive():
-                    self.running = False
-                    self.ping_thread.join()
+                self.stop_ping()
                 self.running = True
                 self.log_text.delete(1.0, tk.END)  # Limpa o log antes de iniciar
                 self.start_stop_button.config(text="Parar Ping")
                 self.start_ping(host)
 
+    def stop_ping(self):
+        """Interrompe a thread de ping em andamento."""
+        self.running = False
+        self.stop_event.set()  # A thread termina sozinha após o ping em andamento, sem travar a janela
+
     def start_ping(self, host):
+        stop_event = threading.Event()
+        self.stop_event = stop_event
+
         def ping():
             last_status = True
-            while self.running:
-                # Comando de ping baseado no sistema operacional
-                command = ["ping", "-c", "1", host] if platform.system().lower() != "windows" else ["ping", "-n", "1",
-                                                                                                    host]
-
-                response = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                current_status = response.returncode == 0
+            while not stop_event.is_set():
+                # Ping sempre atualizado (sem cache), usando o mesmo motor e os mesmos RTTs do HostFlow
+                try:
+                    current_status, ttl = execute_ping(host)
+                    ping_cache.put(('ping', host.lower()), (current_status, ttl))
+                except StageTimeout as e:
+                    current_status, ttl = e.result  # Ping travado: não atualiza o cache
+                if stop_event.is_set():
+                    break  # Monitor parado durante o ping: o resultado não é mais exibido
 
                 # Atualiza a cor do círculo e log com base no status
                 if current_status:
-                    self.status_color = "green"
-                    log_message = f"{host} está respondendo.\n"
-                    last_status = True
+                    self.updates.put(("green", f"{host} está respondendo.\n"))
+                elif last_status:
+                    self.updates.put(("orange", f"{host} não está respondendo. Aguardando...\n"))
+                    if stop_event.wait(self.timeout):
+                        break
+                    self.updates.put(("red", f"{host} não está respondendo. Tempo limite excedido.\n"))
                 else:
-                    if last_status:
-                        self.status_color = "orange"
-                        log_message = f"{host} não está respondendo. Aguardando...\n"
-                        time.sleep(self.timeout)
-                        if not current_status:
-                            self.status_color = "red"
-                            log_message = f"{host} não está respondendo. Tempo limite excedido.\n"
-                    else:
-                        self.status_color = "red"
-                        log_message = f"{host} não está respondendo.\n"
-
-                # Atualiza a interface gráfica
-                self.update_circle()
-                self.log_text.insert(tk.END, log_message)
-                self.log_text.see(tk.END)  # Rola para o final do log
+                    self.updates.put(("red", f"{host} não está respondendo.\n"))
                 last_status = current_status
-                time.sleep(1)  # Intervalo entre pings
+                stop_event.wait(self.interval)  # Intervalo entre pings
 
-        self.ping_thread = threading.Thread(target=ping)
+        self.ping_thread = threading.Thread(target=ping, daemon=True)
         self.ping_thread.start()
 
     def on_closing(self):
-        self.running = False
-        if self.ping_thread is not None:
-            self.ping_thread.join()
+        self.stop_ping()
+        self.master.after_cancel(self.poll_id)
         self.master.destroy()
 
 
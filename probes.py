@@ -0,0 +1,338 @@
+import errno
+import selectors
+import socket
+import time
+from collections import namedtuple
+
+# ========================================================================
+# Sondas de serviço do HostFlow
+# Cada sonda conecta em uma porta, envia (opcionalmente) uma requisição curta
+# e lê uma resposta limitada em bytes e em tempo. Todas as sondas de um host
+# rodam juntas em um único laço não bloqueante (selectors), de modo que as
+# verificações extras quase não aumentam a latência por host.
+# ========================================================================
+
+# Tempo limite padrão (segundos) para estabelecer as conexões
+CONNECT_TIMEOUT = 2
+# Atraso (segundos) entre as tentativas de conexão aos endereços de um mesmo host (Happy Eyeballs)
+CONNECTION_ATTEMPT_DELAY = 0.25
+# Intervalo (segundos) entre verificações de cancelamento da varredura
+CANCEL_POLL_INTERVAL = 0.2
+# Códigos de retorno de connect_ex que indicam conexão em andamento (inclui o código do Windows)
+CONNECT_IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY,
+                       getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK))
+
+# Resultado de uma sonda: open indica se a porta aceitou conexão; detail descreve o serviço;
+# rtt é o tempo (segundos) até a resposta do host à conexão (aceita ou recusada), se houve resposta,
+# e address é o endereço que respondeu
+ProbeResult = namedtuple('ProbeResult', ['name', 'port', 'open', 'detail', 'rtt', 'address'],
+                         defaults=[None, None])
+
+
+class TCPProbe:
+    """Sonda básica: apenas verifica se a porta aceita conexão. Base para as demais sondas."""
+
+    name = 'TCP'
+    port = None
+    max_bytes = 0  # Orçamento de bytes lidos da resposta (0 = não lê nada)
+    time_budget = 1.0  # Orçamento de tempo (segundos) para a resposta após a conexão
+
+    def __init__(self, port=None, name=None, max_bytes=None, time_budget=None):
+        if port is not None:
+            self.port = port
+        if name is not None:
+            self.name = name
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if time_budget is not None:
+            self.time_budget = time_budget
+
+    def request(self, ip):
+        """Bytes enviados logo após a conexão."""
+        return b''
+
+    def is_complete(self, data):
+        """Indica se a resposta já é suficiente para a análise (encerra a leitura antes do orçamento)."""
+        return False
+
+    def parse(self, data):
+        """Converte a resposta lida em uma descrição do serviço."""
+        return ''
+
+
+class SSHProbe(TCPProbe):
+    """Lê o banner de identificação do servidor SSH."""
+
+    name = 'SSH'
+    port = 22
+    max_bytes = 256
+
+    def is_complete(self, data):
+        return b'\n' in data
+
+    def parse(self, data):
+        banner = data.split(b'\n', 1)[0].strip().decode('ascii', 'replace')
+        return banner if banner.startswith('SSH-') else ''
+
+
+class RDPProbe(TCPProbe):
+    """Envia um X.224 Connection Request e interpreta o Connection Confirm do RDP."""
+
+    name = 'RDP'
+    port = 3389
+    max_bytes = 64
+    # TPKT + X.224 Connection Request + RDP Negotiation Request (TLS | CredSSP)
+    CONNECTION_REQUEST = bytes.fromhex('030000130ee000000000000100080003000000')
+    PROTOCOLS = {0: 'RDP', 1: 'TLS', 2: 'CredSSP', 8: 'CredSSP/EA'}
+
+    def request(self, ip):
+        return self.CONNECTION_REQUEST
+
+    def is_complete(self, data):
+        return len(data) >= 4 and len(data) >= int.from_bytes(data[2:4], 'big')
+
+    def parse(self, data):
+        if len(data) < 6 or data[0] != 0x03 or data[5] & 0xF0 != 0xD0:
+            return ''  # Não é um Connection Confirm
+        if len(data) >= 19 and data[11] == 0x02:  # RDP Negotiation Response
+            protocol = int.from_bytes(data[15:19], 'little')
+            return f"RDP ({self.PROTOCOLS.get(protocol, protocol)})"
+        if len(data) >= 19 and data[11] == 0x03:  # RDP Negotiation Failure
+            return "RDP (negociação recusada)"
+        return 'RDP'
+
+
+class HTTPProbe(TCPProbe):
+    """Envia uma requisição HTTP curta e lê a linha de status e o cabeçalho Server."""
+
+    name = 'HTTP'
+    port = 80
+    max_bytes = 1024
+    method = 'HEAD'
+    path = '/'
+
+    def request(self, ip):
+        host = f"[{ip}]" if ':' in ip else ip
+        return (f"{self.method} {self.path} HTTP/1.1\r\nHost: {host}:{self.port}\r\n"
+                f"Content-Length: 0\r\nConnection: close\r\n\r\n").encode('ascii')
+
+    def is_complete(self, data):
+        return b'\r\n\r\n' in data
+
+    def parse(self, data):
+        if not data.startswith(b'HTTP/'):
+            return ''
+        lines = data.split(b'\r\n\r\n', 1)[0].decode('latin-1').split('\r\n')
+        parts = lines[0].split(' ', 2)
+        detail = f"{self.name} {parts[1]}" if len(parts) > 1 else self.name
+        for line in lines[1:]:
+            if line.lower().startswith('server:'):
+                detail += f" ({line.split(':', 1)[1].strip()})"
+                break
+        return detail
+
+
+class WinRMProbe(HTTPProbe):
+    """Verifica o endpoint WS-Management (WinRM) via HTTP na porta 5985."""
+
+    name = 'WinRM'
+    port = 5985
+    method = 'POST'
+    path = '/wsman'
+
+
+# Sondas executadas em cada host (novas sondas podem ser adicionadas com register_probe)
+DEFAULT_PROBES = [
+    SSHProbe(),
+    RDPProbe(),
+    WinRMProbe(),
+    TCPProbe(port=5986, name='WinRM-HTTPS'),  # Apenas conexão (sem handshake TLS)
+    HTTPProbe(),
+]
+
+
+def register_probe(probe):
+    """Adiciona uma sonda à lista executada em cada host."""
+    DEFAULT_PROBES.append(probe)
+
+
+def interleave_addresses(addresses):
+    """Ordena os endereços alternando IPv6 e IPv4, a partir da família do primeiro (RFC 8305)."""
+    addresses = list(dict.fromkeys(addresses))  # Remove duplicados mantendo a ordem
+    if not addresses:
+        return addresses
+    first_family = ':' in addresses[0]
+    preferred = [address for address in addresses if (':' in address) == first_family]
+    others = [address for address in addresses if (':' in address) != first_family]
+    ordered = []
+    for index in range(max(len(preferred), len(others))):
+        ordered.extend(group[index] for group in (preferred, others) if index < len(group))
+    return ordered
+
+
+class _Attempt:
+    """Tentativa de conexão de uma sonda a um dos endereços do host."""
+
+    def __init__(self, state, address, sock):
+        self.state = state
+        self.address = address
+        self.sock = sock
+        self.started = time.monotonic()
+
+
+class _ProbeState:
+    """Estado de uma sonda durante a execução no laço não bloqueante."""
+
+    def __init__(self, probe, addresses):
+        self.probe = probe
+        self.pending_addresses = list(addresses)  # Endereços ainda não tentados
+        self.attempts = []  # Tentativas de conexão em andamento
+        self.next_attempt_at = time.monotonic()
+        self.sock = None  # Conexão vencedora
+        self.address = None  # Endereço que respondeu (aceitou ou recusou a conexão)
+        self.data = b''
+        self.read_deadline = None
+        self.rtt = None
+
+    @property
+    def connected(self):
+        return self.sock is not None
+
+
+def run_probes(addresses, probes=None, timeout=CONNECT_TIMEOUT, job=None, budget_end=None):
+    """Executa as sondas em paralelo no host e retorna um dicionário nome -> ProbeResult.
+
+    addresses pode ser um IP ou a lista de endereços (IPv4/IPv6) do host: as conexões de
+    cada sonda disputam os endereços no estilo Happy Eyeballs (RFC 8305), uma nova tentativa
+    a cada CONNECTION_ATTEMPT_DELAY; a primeira conexão aceita vence e as demais são fechadas.
+    budget_end (time.monotonic) limita também a leitura das respostas ao prazo do host.
+    """
+    probes = DEFAULT_PROBES if probes is None else probes
+    addresses = interleave_addresses([addresses] if isinstance(addresses, str) else addresses)
+    results = {}
+    states = [_ProbeState(probe, addresses) for probe in probes]
+    connect_deadline = time.monotonic() + timeout
+    if budget_end is not None:
+        connect_deadline = min(connect_deadline, budget_end)
+
+    with selectors.DefaultSelector() as selector:
+
+        def finish(state, is_open):
+            for attempt in state.attempts:
+                selector.unregister(attempt.sock)
+                attempt.sock.close()
+            state.attempts = []
+            if state.sock is not None:
+                selector.unregister(state.sock)
+                state.sock.close()
+            state.pending_addresses = []
+            detail = state.probe.parse(state.data) if is_open else ''
+            results[state.probe.name] = ProbeResult(state.probe.name, state.probe.port, is_open, detail,
+                                                    state.rtt, state.address)
+
+        def start_attempt(state):
+            # Inicia a conexão ao próximo endereço; endereços inalcançáveis são descartados na hora
+            while state.pending_addresses:
+                address = state.pending_addresses.pop(0)
+                try:
+                    sock = socket.socket(socket.AF_INET6 if ':' in address else socket.AF_INET, socket.SOCK_STREAM)
+                except OSError:
+                    continue
+                sock.setblocking(False)
+                error = sock.connect_ex((address, state.probe.port))
+                if error != 0 and error not in CONNECT_IN_PROGRESS:
+                    sock.close()
+                    continue
+                attempt = _Attempt(state, address, sock)
+                state.attempts.append(attempt)
+                selector.register(sock, selectors.EVENT_WRITE, attempt)
+                state.next_attempt_at = time.monotonic() + CONNECTION_ATTEMPT_DELAY
+                return
+            if not state.attempts:
+                finish(state, False)  # Nenhum endereço aceitou a conexão
+
+        def drop_attempt(attempt):
+            selector.unregister(attempt.sock)
+            attempt.sock.close()
+            attempt.state.attempts.remove(attempt)
+
+        def active():
+            return [state for state in states if state.probe.name not in results]
+
+        for state in states:
+            start_attempt(state)
+
+        while active():
+            now = time.monotonic()
+            if job and job.is_cancelled():
+                break
+            for state in active():
+                if state.connected:
+                    if now >= state.read_deadline:
+                        finish(state, True)  # Porta aberta; analisa o que foi lido até aqui
+                elif now >= connect_deadline:
+                    finish(state, False)
+                elif state.pending_addresses and now >= state.next_attempt_at:
+                    start_attempt(state)  # A tentativa anterior demorou: dispara a próxima em paralelo
+            if not active():
+                break
+
+            deadlines = [connect_deadline]
+            for state in active():
+                if state.connected:
+                    deadlines.append(state.read_deadline)
+                elif state.pending_addresses:
+                    deadlines.append(state.next_attempt_at)
+            wait = max(0, min(min(deadlines) - now, CANCEL_POLL_INTERVAL))
+            for key, _ in selector.select(wait):
+                if isinstance(key.data, _Attempt):
+                    attempt = key.data
+                    state = attempt.state
+                    if attempt not in state.attempts:
+                        continue  # Tentativa já encerrada neste ciclo
+                    error = attempt.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if error in (0, errno.ECONNREFUSED, getattr(errno, 'WSAECONNREFUSED', errno.ECONNREFUSED)):
+                        state.rtt = time.monotonic() - attempt.started  # O host respondeu (aceitou ou recusou)
+                        state.address = attempt.address
+                    if error != 0:
+                        drop_attempt(attempt)
+                        if not state.attempts:
+                            start_attempt(state)  # Falhou: tenta o próximo endereço sem esperar
+                        continue
+                    # Conexão vencedora: fecha as tentativas perdedoras
+                    selector.unregister(attempt.sock)
+                    state.attempts.remove(attempt)
+                    for loser in list(state.attempts):
+                        drop_attempt(loser)
+                    state.sock = attempt.sock
+                    selector.register(state.sock, selectors.EVENT_READ, state)
+                    state.read_deadline = time.monotonic() + state.probe.time_budget
+                    if budget_end is not None:
+                        state.read_deadline = min(state.read_deadline, budget_end)
+                    if state.probe.max_bytes <= 0:
+                        finish(state, True)
+                        continue
+                    try:
+                        state.sock.send(state.probe.request(attempt.address))
+                    except OSError:
+                        finish(state, True)
+                    continue
+                state = key.data
+                if state.probe.name in results:
+                    continue
+                try:
+                    chunk = state.sock.recv(state.probe.max_bytes - len(state.data))
+                except (BlockingIOError, InterruptedError):
+                    continue
+                except OSError:
+                    chunk = b''
+                state.data += chunk
+                if (not chunk or len(state.data) >= state.probe.max_bytes
+                        or state.probe.is_complete(state.data)):
+                    finish(state, True)
+
+        # Varredura cancelada: fecha as conexões pendentes
+        for state in active():
+            finish(state, False)
+
+    return results
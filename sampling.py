@@ -0,0 +1,96 @@
+import math
+import random
+import re
+
+from deadline import subnet_key
+
+# ========================================================================
+# Estimativa rápida por amostragem do HostFlow
+# Analisa uma amostra aleatória (opcionalmente estratificada por sub-rede)
+# da lista de hosts e estima a proporção de cada categoria (cor) com
+# intervalos de confiança, atualizados a cada novo resultado.
+# ========================================================================
+
+# Tamanho padrão da amostra (cerca de ±5 pontos percentuais com 95% de confiança)
+SAMPLE_SIZE = 400
+# Valor z do nível de confiança (1.96 = 95%)
+CONFIDENCE_Z = 1.96
+# Categorias estimadas, na ordem exibida
+CATEGORIES = ('green', 'yellow', 'orange', 'red')
+
+
+def stratum_key(host):
+    """Estrato do host: a sub-rede para IPs ou o prefixo alfabético (código do site) para nomes."""
+    subnet = subnet_key(host)
+    if subnet:
+        return subnet
+    prefix = re.match(r'[A-Za-z]*', host).group(0)
+    return prefix.upper()
+
+
+def draw_sample(hosts, size=SAMPLE_SIZE, stratified=True, seed=None):
+    """Sorteia uma amostra dos hosts (sem repetição), em ordem aleatória.
+
+    Na amostra estratificada cada estrato recebe uma quota proporcional ao seu
+    tamanho, o que garante que todas as sub-redes/sites grandes sejam representados.
+    """
+    rng = random.Random(seed)
+    population = list(dict.fromkeys(hosts))  # Remove duplicados mantendo a ordem
+    if size >= len(population):
+        sample = population
+    elif not stratified:
+        sample = rng.sample(population, size)
+    else:
+        strata = {}
+        for host in population:
+            strata.setdefault(stratum_key(host), []).append(host)
+        # Alocação proporcional (método dos maiores restos)
+        quotas = {key: size * len(members) / len(population) for key, members in strata.items()}
+        allocation = {key: int(quota) for key, quota in quotas.items()}
+        leftover = size - sum(allocation.values())
+        for key in sorted(quotas, key=lambda key: quotas[key] - allocation[key], reverse=True)[:leftover]:
+            allocation[key] += 1
+        sample = []
+        for key, members in strata.items():
+            sample.extend(rng.sample(members, allocation[key]))
+    sample = list(sample)
+    rng.shuffle(sample)  # Resultados parciais também são representativos
+    return sample
+
+
+def wilson_interval(successes, n, population=None, z=CONFIDENCE_Z):
+    """Intervalo de confiança de Wilson para uma proporção, com correção para população finita."""
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    z2 = z * z
+    if population and population > 1:
+        z2 *= (population - n) / (population - 1)  # Correção para amostragem sem reposição
+    denominator = 1 + z2 / n
+    center = (p + z2 / (2 * n)) / denominator
+    margin = math.sqrt(max(0.0, p * (1 - p) / n + z2 / (4 * n * n))) * math.sqrt(z2) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+class ProportionEstimate:
+    """Acumula as categorias da amostra e calcula as proporções com intervalos de confiança."""
+
+    def __init__(self, population, sample_size):
+        self.population = population
+        self.sample_size = sample_size
+        self.counts = {category: 0 for category in CATEGORIES}
+        self.total = 0
+
+    def add(self, category):
+        """Registra o resultado (categoria/cor) de um host da amostra."""
+        self.counts[category] = self.counts.get(category, 0) + 1
+        self.total += 1
+
+    def estimates(self):
+        """Retorna categoria -> (proporção, limite inferior, limite superior)."""
+        result = {}
+        for category, count in self.counts.items():
+            proportion = count / self.total if self.total else 0.0
+            low, high = wilson_interval(count, self.total, self.population)
+            result[category] = (proportion, low, high)
+        return result
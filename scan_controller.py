@@ -0,0 +1,232 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ========================================================================
+# Controlador de varreduras em segundo plano do HostFlow
+# Mantém uma fila de prioridade única para todas as varreduras, permitindo
+# cancelar, pausar e retomar cada varredura (job) sem bloquear a interface.
+# Varreduras com a mesma prioridade são intercaladas: cada host recebe uma
+# etiqueta sequencial dentro do seu job, que começa no ponto em que a fila
+# está, de modo que uma varredura pequena não espera o fim de uma grande.
+# ========================================================================
+
+# Prioridades (valores menores são processados primeiro)
+PRIORITY_HIGH = 0     # Hosts selecionados ou visíveis na tabela
+PRIORITY_NORMAL = 10  # Ordem natural da lista
+
+
+class ScanJob:
+    """Representa uma varredura em andamento e serve de sinal de cancelamento para as sondas."""
+
+    def __init__(self, job_id, hosts, task, on_done=None):
+        self.job_id = job_id
+        self.hosts = list(hosts)
+        self.task = task
+        self.on_done = on_done
+        self.total = len(self.hosts)
+        self.dispatched = 0
+        self.completed = 0
+        self.paused = False
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self._pending = {}  # índice do host -> prioridade atual
+        self._parked = []  # entradas retiradas da fila enquanto o job está pausado
+        self._tags = {}  # prioridade -> próxima etiqueta do job nessa prioridade
+        self._indices_by_host = {}
+        self._abort_callbacks = set()
+        self._lock = threading.Lock()
+        for index, host in enumerate(self.hosts):
+            self._indices_by_host.setdefault(host, []).append(index)
+
+    def is_cancelled(self):
+        """Indica se a varredura foi cancelada."""
+        return self.cancelled.is_set()
+
+    def register_abort(self, callback):
+        """Registra uma função que interrompe uma sonda em andamento (ex.: matar o processo do ping)."""
+        with self._lock:
+            if not self.cancelled.is_set():
+                self._abort_callbacks.add(callback)
+                return
+        callback()  # Já cancelado: interrompe imediatamente
+
+    def unregister_abort(self, callback):
+        """Remove uma função registrada com register_abort."""
+        with self._lock:
+            self._abort_callbacks.discard(callback)
+
+    def cancel(self):
+        """Cancela a varredura e interrompe as sondas em andamento."""
+        with self._lock:
+            self.cancelled.set()
+            callbacks = list(self._abort_callbacks)
+            self._abort_callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except OSError:
+                pass  # A sonda já havia terminado
+
+
+class ScanController:
+    """Despacha os hosts de todas as varreduras para um pool de threads em ordem de prioridade."""
+
+    def __init__(self, max_workers):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._slots = threading.Semaphore(max_workers)
+        self._condition = threading.Condition()
+        self._heap = []  # (prioridade, etiqueta, job_id, índice)
+        self._virtual_time = {}  # prioridade -> etiqueta da última entrada despachada
+        self._job_ids = itertools.count(1)
+        self._jobs = {}
+        self._shutdown = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name="ScanController", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, hosts, task, on_done=None, priority=PRIORITY_NORMAL):
+        """Cria uma nova varredura; task(host, job) é executada para cada host. Retorna o ScanJob."""
+        with self._condition:
+            job = ScanJob(next(self._job_ids), hosts, task, on_done)
+            self._jobs[job.job_id] = job
+            for index in range(job.total):
+                job._pending[index] = priority
+                self._push(job, index, priority)
+            self._condition.notify()
+        if job.total == 0:
+            self._finish(job)
+        return job
+
+    def get_job(self, job_id):
+        """Retorna o ScanJob correspondente ao job_id (ou None se já finalizado)."""
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def prioritize(self, job_id, hosts, priority=PRIORITY_HIGH):
+        """Move os hosts informados para a frente da fila, se ainda não foram iniciados."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for host in hosts:
+                for index in job._indices_by_host.get(host, ()):
+                    current = job._pending.get(index)
+                    if current is not None and priority < current:
+                        # A entrada antiga permanece no heap e é descartada ao ser retirada
+                        job._pending[index] = priority
+                        self._push(job, index, priority)
+            self._condition.notify()
+
+    def pause(self, job_id):
+        """Pausa a varredura; as sondas em andamento terminam normalmente."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.paused = True
+
+    def resume(self, job_id):
+        """Retoma uma varredura pausada."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or not job.paused:
+                return
+            job.paused = False
+            # Novas etiquetas: o job retomado volta a ser intercalado com os demais, sem passar à frente
+            for priority, _, _, index in job._parked:
+                if job._pending.get(index) == priority:  # Entradas repriorizadas durante a pausa são descartadas
+                    self._push(job, index, priority)
+            job._parked = []
+            self._condition.notify()
+
+    def cancel(self, job_id):
+        """Cancela a varredura, descartando os hosts pendentes e abortando as sondas em andamento."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job._pending.clear()
+            job._parked = []
+        job.cancel()
+        self._check_finished(job)
+
+    def shutdown(self):
+        """Cancela todas as varreduras e encerra o pool de threads."""
+        with self._condition:
+            jobs = list(self._jobs.values())
+            self._shutdown = True
+            self._condition.notify()
+        for job in jobs:
+            self.cancel(job.job_id)
+        self._executor.shutdown(wait=False)
+
+    def _push(self, job, index, priority):
+        """Enfileira o host do job com a próxima etiqueta do job (chamado com o lock do controlador)."""
+        tag = max(job._tags.get(priority, 0), self._virtual_time.get(priority, 0))
+        job._tags[priority] = tag + 1
+        heapq.heappush(self._heap, (priority, tag, job.job_id, index))
+
+    def _dispatch(self):
+        """Laço da thread despachante: retira o próximo host da fila e o envia ao pool."""
+        while True:
+            self._slots.acquire()  # Aguarda uma thread livre no pool
+            entry = self._next_entry()
+            if entry is None:
+                return
+            job, index = entry
+            try:
+                self._executor.submit(self._run, job, index)
+            except RuntimeError:
+                return  # Pool encerrado
+
+    def _next_entry(self):
+        """Bloqueia até haver um host elegível na fila (ou o controlador ser encerrado)."""
+        with self._condition:
+            while True:
+                if self._shutdown:
+                    return None
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                entry = heapq.heappop(self._heap)
+                priority, _, job_id, index = entry
+                job = self._jobs.get(job_id)
+                if job is None or job.is_cancelled() or job._pending.get(index) != priority:
+                    continue  # Entrada obsoleta (job cancelado ou host repriorizado)
+                if job.paused:
+                    job._parked.append(entry)
+                    continue
+                del job._pending[index]
+                self._virtual_time[priority] = max(self._virtual_time.get(priority, 0), entry[1])
+                job.dispatched += 1
+                return job, index
+
+    def _run(self, job, index):
+        """Executa a tarefa de um host e contabiliza a conclusão."""
+        try:
+            if not job.is_cancelled():
+                job.task(job.hosts[index], job)
+        except Exception as e:
+            print(f"Erro ao analisar {job.hosts[index]}: {e}")
+        finally:
+            self._slots.release()
+            with self._condition:
+                job.completed += 1
+            self._check_finished(job)
+
+    def _check_finished(self, job):
+        """Finaliza o job quando não há hosts pendentes nem sondas em andamento."""
+        with self._condition:
+            if job._pending or job._parked or job.completed < job.dispatched:
+                return
+        self._finish(job)
+
+    def _finish(self, job):
+        """Marca o job como concluído e o remove do controlador."""
+        with self._condition:
+            if job.done.is_set():
+                return
+            job.done.set()
+            self._jobs.pop(job.job_id, None)
+        if job.on_done:
+            job.on_done(job)
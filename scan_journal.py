@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# ========================================================================
+# Diário (journal) de varreduras do HostFlow
+# Cada varredura grava, em modo somente-anexação, o resultado de cada host
+# concluído. Se a aplicação for fechada ou travar no meio da varredura, uma
+# nova varredura da mesma lista retoma a partir do diário.
+# ========================================================================
+
+# Pasta onde os diários são gravados
+JOURNAL_DIR = 'journal'
+# Quantidade de resultados acumulados antes de forçar a gravação em disco (fsync)
+JOURNAL_FSYNC_BATCH = 50
+# Intervalo máximo (segundos) entre gravações forçadas em disco
+JOURNAL_FSYNC_INTERVAL = 1.0
+# Idade máxima (segundos) de um diário para ser retomado; diários mais antigos são descartados
+JOURNAL_MAX_AGE = 24 * 60 * 60
+
+
+def scan_id_for(hosts):
+    """Gera o ID da varredura a partir da lista de hosts (independe da ordem)."""
+    digest = hashlib.sha1('\n'.join(sorted(set(hosts))).encode('utf-8')).hexdigest()
+    return digest[:16]
+
+
+class ScanJournal:
+    """Diário somente-anexação dos resultados de uma varredura, com fsync em lotes."""
+
+    def __init__(self, scan_id, directory=JOURNAL_DIR):
+        self.scan_id = scan_id
+        self.path = os.path.join(directory, f"{scan_id}.jsonl")
+        self.completed = {}  # host -> resultado já gravado no diário
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            if time.time() - os.path.getmtime(self.path) > JOURNAL_MAX_AGE:
+                os.remove(self.path)  # Resultados antigos demais para serem reaproveitados
+            else:
+                self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if self._file.tell() > 0 and not self._ends_with_newline():
+            self._file.write('\n')  # Isola a linha incompleta deixada por uma gravação interrompida
+
+    def _load(self):
+        """Lê os resultados já gravados, ignorando uma última linha incompleta (gravação interrompida)."""
+        with open(self.path, encoding='utf-8', errors='replace') as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                    self.completed[record['host']] = tuple(record['result'])
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    def _ends_with_newline(self):
+        """Verifica se o diário termina com uma linha completa."""
+        with open(self.path, 'rb') as journal_file:
+            journal_file.seek(-1, os.SEEK_END)
+            return journal_file.read(1) == b'\n'
+
+    def append(self, host, result):
+        """Grava o resultado de um host; o fsync é feito em lotes."""
+        line = json.dumps({'host': host, 'result': list(result)}, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line)
+            self._file.flush()  # Protege contra o fechamento do processo; o fsync protege contra queda do sistema
+            self.completed[host] = tuple(result)
+            self._unsynced += 1
+            if (self._unsynced >= JOURNAL_FSYNC_BATCH
+                    or time.monotonic() - self._last_sync >= JOURNAL_FSYNC_INTERVAL):
+                self._sync()
+
+    def _sync(self):
+        """Força a gravação em disco dos resultados pendentes."""
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Grava os resultados pendentes e fecha o diário, mantendo-o para retomada."""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+    def finish(self):
+        """Fecha e remove o diário de uma varredura concluída."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,165 @@
+import argparse
+import json
+import queue
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from scan_controller import ScanController
+from hostflow_core import (MAX_HOSTS, MAX_THREADS, COLUMNS, is_valid_host, unique_hosts, get_inventory,
+                           analyze_host, classify_result, dns_cache, ping_cache, probe_cache)
+
+# ========================================================================
+# Serviço HTTP local do HostFlow
+# Expõe o motor de análise para vários usuários ao mesmo tempo, com um único
+# pool de threads e caches de DNS, ping, sondas e inventário compartilhados.
+#
+#   POST /scan    corpo: lista de hosts (um por linha) ou JSON {"hosts": [...]}
+#                 resposta: um resultado por host, em JSON Lines (padrão) ou
+#                 Server-Sent Events (Accept: text/event-stream ou ?format=sse)
+#   GET  /status  uso dos caches
+# ========================================================================
+
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+# Intervalo (segundos) entre mensagens de keep-alive no modo Server-Sent Events
+HEARTBEAT_INTERVAL = 15
+
+# Pool de threads compartilhado entre todos os clientes
+scan_controller = ScanController(max_workers=MAX_THREADS)
+
+
+def result_to_dict(result):
+    """Converte a tupla de analyze_host em um dicionário com os nomes das colunas e a cor."""
+    data = dict(zip(COLUMNS, result))
+    data['Cor'] = classify_result(result)
+    return data
+
+
+def parse_hosts(body, content_type):
+    """Extrai a lista de hosts (válidos, sem repetições) do corpo da requisição (texto ou JSON)."""
+    text = body.decode('utf-8-sig')
+    if 'json' in content_type:
+        data = json.loads(text)
+        hosts = data['hosts'] if isinstance(data, dict) else data
+    else:
+        hosts = text.splitlines()
+    return unique_hosts(host.strip() for host in hosts if is_valid_host(host.strip()))
+
+
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    """Atende as requisições de varredura, enviando os resultados conforme ficam prontos."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if urlparse(self.path).path != '/status':
+            self.send_json(404, {'erro': 'Caminho não encontrado.'})
+            return
+        self.send_json(200, {'dns': dns_cache.stats(), 'ping': ping_cache.stats(), 'sondas': probe_cache.stats()})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/scan':
+            self.send_json(404, {'erro': 'Caminho não encontrado.'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            hosts = parse_hosts(self.rfile.read(length), self.headers.get('Content-Type', ''))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.send_json(400, {'erro': 'Lista de hosts inválida.'})
+            return
+        if not hosts:
+            self.send_json(400, {'erro': 'Nenhum host válido informado.'})
+            return
+        if len(hosts) > MAX_HOSTS:
+            self.send_json(400, {'erro': f"O número máximo de hosts permitidos é {MAX_HOSTS}."})
+            return
+
+        sse = ('text/event-stream' in self.headers.get('Accept', '')
+               or parse_qs(url.query).get('format') == ['sse'])
+        try:
+            inventory = get_inventory()
+        except (OSError, KeyError) as e:
+            self.log_message("Inventário indisponível: %s", e)
+            inventory = {}
+
+        result_queue = queue.Queue()
+        job = scan_controller.submit(hosts,
+                                     lambda host, scan_job: analyze_host(host, inventory, result_queue, scan_job),
+                                     on_done=lambda scan_job: result_queue.put(None))
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream' if sse else 'application/x-ndjson')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            while True:
+                try:
+                    result = result_queue.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    if sse:
+                        self.write_chunk(': keep-alive\n\n')
+                    continue
+                if result is None:
+                    break
+                line = json.dumps(result_to_dict(result), ensure_ascii=False)
+                self.write_chunk(f"event: result\ndata: {line}\n\n" if sse else line + '\n')
+            if sse:
+                self.write_chunk('event: done\ndata: {}\n\n')
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            scan_controller.cancel(job.job_id)  # Cliente desconectou: aborta a varredura
+
+    def write_chunk(self, text):
+        """Envia um bloco da resposta (Transfer-Encoding: chunked)."""
+        data = text.encode('utf-8')
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def send_json(self, status, data):
+        """Envia uma resposta JSON simples."""
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de análise de hosts do HostFlow.")
+    parser.add_argument('--host', default=SERVICE_HOST, help="Endereço de escuta (padrão: %(default)s)")
+    parser.add_argument('--port', type=int, default=SERVICE_PORT, help="Porta de escuta (padrão: %(default)s)")
+    parser.add_argument('--prefetch', action='store_true',
+                        help="Pré-carrega em segundo plano o DNS dos hosts do inventário")
+    parser.add_argument('--prefetch-rate', type=float, default=None,
+                        help="Limite de consultas de DNS por segundo do pré-carregamento")
+    parser.add_argument('--prefetch-ttl', type=float, default=None,
+                        help="Validade (segundos) das entradas pré-carregadas")
+    args = parser.parse_args()
+
+    prefetcher = None
+    if args.prefetch:
+        from dns_prefetch import PREFETCH_QUERY_RATE, PREFETCH_TTL, DNSPrefetcher
+        prefetcher = DNSPrefetcher(args.prefetch_rate or PREFETCH_QUERY_RATE,
+                                   ttl=args.prefetch_ttl or PREFETCH_TTL).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), ScanRequestHandler)
+    print(f"Serviço HostFlow em http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if prefetcher is not None:
+            prefetcher.stop()
+        scan_controller.shutdown()
+
+
+if __name__ == "__main__":
+    main()
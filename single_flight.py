@@ -0,0 +1,58 @@
+import threading
+
+# ========================================================================
+# Coalescência de operações idênticas em andamento (single-flight)
+# Quando várias threads pedem a mesma operação (mesma chave) ao mesmo tempo,
+# apenas a primeira executa a operação de rede; as demais aguardam e recebem
+# o mesmo resultado.
+# ========================================================================
+
+
+class _Call:
+    """Operação em andamento compartilhada entre os chamadores da mesma chave."""
+
+    def __init__(self, job):
+        self.job = job
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Executa no máximo uma operação por chave ao mesmo tempo e repassa o resultado a todos os chamadores."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, job=None):
+        """Executa fn() ou aguarda a execução já em andamento para a mesma chave."""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = _Call(job)
+                    self._calls[key] = call
+            if leader:
+                return self._run(key, call, fn)
+
+            call.done.wait()
+            if call.job is not None and call.job.is_cancelled() and not (job and job.is_cancelled()):
+                continue  # A varredura que executava a operação foi cancelada: refaz para este chamador
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def _run(self, key, call, fn):
+        """Executa a operação como líder e libera os chamadores que aguardam."""
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
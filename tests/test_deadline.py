@@ -0,0 +1,26 @@
+import unittest
+
+from deadline import MAX_TIMEOUT, MIN_TIMEOUT, RttEstimator
+
+
+class RttEstimatorTest(unittest.TestCase):
+
+    def test_fast_answers_reach_minimum(self):
+        estimator = RttEstimator()
+        for _ in range(50):
+            estimator.observe('dns', 0.001)
+        self.assertEqual(estimator.timeout('dns'), MIN_TIMEOUT)
+
+    def test_back_off_doubles_timeout(self):
+        estimator = RttEstimator()
+        for _ in range(50):
+            estimator.observe('dns', 0.001)
+        estimator.back_off('dns', MIN_TIMEOUT)
+        self.assertGreaterEqual(estimator.timeout('dns'), 2 * MIN_TIMEOUT)
+        for _ in range(10):
+            estimator.back_off('dns', estimator.timeout('dns'))
+        self.assertEqual(estimator.timeout('dns'), MAX_TIMEOUT)
+
+
+if __name__ == '__main__':
+    unittest.main()
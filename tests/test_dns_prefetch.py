@@ -0,0 +1,32 @@
+import unittest
+from unittest import mock
+
+import dns_prefetch
+from dns_prefetch import DNSPrefetcher
+from ttl_cache import TTLCache
+
+
+class StaleTest(unittest.TestCase):
+
+    def setUp(self):
+        patch = mock.patch.object(dns_prefetch, 'dns_cache', TTLCache(300))
+        self.cache = patch.start()
+        self.addCleanup(patch.stop)
+        self.prefetcher = DNSPrefetcher(ttl=3600)
+
+    def test_missing_entry(self):
+        self.assertTrue(self.prefetcher._is_stale('srv01'))
+
+    def test_entry_written_by_scan(self):
+        self.cache.put(('dns', 'srv01'), (['10.1.0.1'], None))  # Validade das varreduras (300 s)
+        self.assertFalse(self.prefetcher._is_stale('SRV01'))
+
+    def test_entry_near_expiry(self):
+        self.cache.put(('dns', 'srv01'), (['10.1.0.1'], None), ttl=3600)
+        with mock.patch('time.monotonic', return_value=self.cache._entries[('dns', 'srv01')][0] - 600):
+            self.assertTrue(self.prefetcher._is_stale('srv01'))  # Resta 1/6 da validade
+            self.assertEqual(self.cache.remaining_fraction(('dns', 'srv01')), 600 / 3600)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import socket
+import unittest
+from unittest import mock
+
+import hostflow_core
+from deadline import StageTimeout
+from hostflow_core import cached, dns_lookup, ping_target
+from ttl_cache import TTLCache
+
+
+class CachedTest(unittest.TestCase):
+
+    def test_stores_answers(self):
+        cache = TTLCache(60)
+        self.assertEqual(cached(cache, 'a', lambda: ([], None)), ([], None))
+        self.assertIsNotNone(cache.remaining('a'))
+
+    def test_does_not_store_timeouts(self):
+        cache = TTLCache(60)
+
+        def timed_out():
+            raise StageTimeout(([], None))
+        self.assertEqual(cached(cache, 'a', timed_out), ([], None))
+        self.assertIsNone(cache.remaining('a'))
+        self.assertEqual(cached(cache, 'a', lambda: (['127.0.0.1'], 'localhost')), (['127.0.0.1'], 'localhost'))
+
+
+class DNSLookupTest(unittest.TestCase):
+
+    def setUp(self):
+        patch = mock.patch.object(hostflow_core, 'dns_cache', TTLCache(60))
+        self.cache = patch.start()
+        self.addCleanup(patch.stop)
+
+    def lookup(self, error):
+        def getaddrinfo(*args):
+            raise error
+        with mock.patch('socket.getaddrinfo', getaddrinfo):
+            return dns_lookup('srv01.invalid')
+
+    def test_temporary_failure_not_cached(self):
+        self.assertEqual(self.lookup(socket.gaierror(socket.EAI_AGAIN, 'Temporary failure')), ([], None))
+        self.assertIsNone(self.cache.remaining(('dns', 'srv01.invalid')))
+
+    def test_nonexistent_name_cached(self):
+        self.assertEqual(self.lookup(socket.gaierror(socket.EAI_NONAME, 'Name or service not known')), ([], None))
+        self.assertIsNotNone(self.cache.remaining(('dns', 'srv01.invalid')))
+
+    def test_temporary_reverse_failure_not_cached(self):
+        def gethostbyaddr(address):
+            raise socket.herror(2, 'Host name lookup failure')  # TRY_AGAIN
+        with mock.patch('socket.getaddrinfo', lambda *args: [(socket.AF_INET, 1, 6, '', ('10.1.0.1', 0))]), \
+                mock.patch('socket.gethostbyaddr', gethostbyaddr):
+            self.assertEqual(dns_lookup('srv01.invalid'), (['10.1.0.1'], None))
+        self.assertIsNone(self.cache.remaining(('dns', 'srv01.invalid')))
+
+
+class PingTargetTest(unittest.TestCase):
+
+    def setUp(self):
+        # Escopo restrito com a faixa 10.9.0.0/16 excluída
+        patches = [mock.patch.object(hostflow_core, 'scope_restricted', lambda: True),
+                   mock.patch.object(hostflow_core, 'in_scope', lambda address: not address.startswith('10.9.'))]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def target(self, addresses):
+        with mock.patch.object(hostflow_core, 'dns_lookup', lambda host, deadline=None: (addresses, None)):
+            return ping_target('srv01')
+
+    def test_all_addresses_in_scope(self):
+        self.assertEqual(self.target(['10.1.0.1', '10.1.0.2']), 'srv01')
+
+    def test_partially_excluded(self):
+        self.assertEqual(self.target(['10.9.0.1', '10.1.0.2']), '10.1.0.2')
+        self.assertIsNone(self.target(['10.9.0.1']))
+
+    def test_unresolved_is_out_of_scope(self):
+        self.assertIsNone(self.target([]))  # Tempo esgotado ou nome inexistente: o nome não é pingado
+
+    def test_ip_literal(self):
+        self.assertEqual(ping_target('10.1.0.1'), '10.1.0.1')
+        self.assertIsNone(ping_target('10.9.0.1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
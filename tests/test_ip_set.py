@@ -0,0 +1,121 @@
+import ipaddress
+import os
+import random
+import tempfile
+import time
+import unittest
+
+from ip_set import BITMAP_THRESHOLD, IPSet, parse_range, read_ip_set
+
+
+class ParseRangeTest(unittest.TestCase):
+
+    def test_single_address_forms(self):
+        for text in ('10.0.0.5', '10.0.0.5/32', '10.0.0.5-10.0.0.5', ' 10.0.0.5 '):
+            first, last = parse_range(text)
+            self.assertEqual(first, last, text)
+
+    def test_invalid_ranges(self):
+        for text in ('10.0.0.9-10.0.0.1', '10.0.0.1-::1', 'abc', '10.0.0.0/33'):
+            with self.assertRaises(ValueError, msg=text):
+                parse_range(text)
+
+
+class IPSetTest(unittest.TestCase):
+
+    def test_add_range_inputs(self):
+        cases = [
+            ('10.0.0.5/32', ['10.0.0.5'], ['10.0.0.4', '10.0.0.6']),
+            ('10.0.0.9-10.0.0.9', ['10.0.0.9'], ['10.0.0.8', '10.0.0.10']),
+            ('::1/128', ['::1'], ['::2', '0.0.0.1']),
+            ('10.1.2.0/24', ['10.1.2.0', '10.1.2.255'], ['10.1.1.255', '10.1.3.0']),
+            ('10.0.1.1-10.0.1.3', ['10.0.1.1', '10.0.1.3'], ['10.0.1.4']),
+            ('2001:db8::/64', ['2001:db8::', '2001:db8::ffff:ffff:ffff:ffff'], ['2001:db8:0:1::']),
+            ('::/0', ['::', 'ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff'], ['10.0.0.1']),
+        ]
+        for text, members, outsiders in cases:
+            ip_set = IPSet([text])
+            for address in members:
+                self.assertIn(address, ip_set, text)
+            for address in outsiders:
+                self.assertNotIn(address, ip_set, text)
+
+    def test_ipv6_range_over_bitmaps(self):
+        ip_set = IPSet()
+        for offset in range(BITMAP_THRESHOLD + 10):
+            ip_set.add(str(ipaddress.IPv6Address('2001:db8::') + offset))
+        self.assertTrue(ip_set._bitmaps)
+        ip_set.add_range('2001:db8::/64')
+        self.assertEqual(sum(ip_set._bit_counts.values()), 0)  # Os endereços passam a ser cobertos pelo intervalo
+        self.assertIn('2001:db8::5', ip_set)
+
+    def test_add_reports_duplicates(self):
+        ip_set = IPSet()
+        self.assertTrue(ip_set.add('10.0.0.1'))
+        self.assertFalse(ip_set.add('10.0.0.1'))
+        self.assertTrue(ip_set.add('::1'))
+        self.assertFalse(ip_set.add('0:0::1'))  # Outra notação do mesmo endereço
+        with self.assertRaises(ValueError):
+            ip_set.add('srv01')
+
+    def test_matches_python_set(self):
+        rng = random.Random(1)
+        bases = [int(ipaddress.IPv4Address('10.0.0.0')), int(ipaddress.IPv4Address('10.1.0.0')),
+                 int(ipaddress.IPv4Address('192.168.0.0'))]
+        ip_set, reference = IPSet(), set()
+        for _ in range(20000):
+            choice = rng.random()
+            if choice < 0.8:
+                address = ipaddress.IPv4Address(rng.choice(bases) + rng.randrange(3000))
+                self.assertEqual(ip_set.add(str(address)), address not in reference)
+                reference.add(address)
+            elif choice < 0.9:
+                address = ipaddress.IPv4Address(rng.choice(bases) + rng.randrange(3000))
+                network = ipaddress.ip_network(f"{address}/{rng.choice([24, 28, 30, 32])}", strict=False)
+                ip_set.add_range(str(network))
+                reference.update(network)
+            else:
+                address = ipaddress.IPv6Address('2001:db8::') + rng.randrange(600)
+                self.assertEqual(ip_set.add(str(address)), address not in reference)
+                reference.add(address)
+        self.assertTrue(ip_set._bitmaps)  # Os blocos densos foram convertidos em mapas de bits
+        self.assertEqual(len(ip_set), len(reference))
+        for _ in range(20000):
+            address = ipaddress.IPv4Address(rng.choice(bases) + rng.randrange(4000))
+            self.assertEqual(str(address) in ip_set, address in reference)
+
+    def test_scattered_addresses_scale_linearly(self):
+        def add_random(count, version):
+            rng = random.Random(count)
+            if version == 4:
+                addresses = [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(count)]
+            else:
+                addresses = [str(ipaddress.IPv6Address(rng.getrandbits(128))) for _ in range(count)]
+            ip_set = IPSet()
+            started = time.perf_counter()
+            for address in addresses:
+                ip_set.add(address)
+            elapsed = time.perf_counter() - started
+            self.assertEqual(len(ip_set), len(set(addresses)))
+            return elapsed, ip_set
+
+        for version in (4, 6):
+            small, _ = add_random(20000, version)
+            large, ip_set = add_random(160000, version)
+            # 8x mais endereços: linear leva cerca de 8x o tempo, quadrático levaria 64x
+            self.assertLess(large, small * 20 + 0.5, version)
+            self.assertFalse(ip_set._starts)  # Endereços isolados não deslocam as listas de intervalos
+
+    def test_read_ip_set(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'exclusões.txt')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('# exclusões\n10.0.0.5/32\n::1/128\n10.0.0.9-10.0.0.9\n2001:db8::/64  # laboratório\n')
+            ip_set = read_ip_set(path)
+        for address in ('10.0.0.5', '::1', '10.0.0.9', '2001:db8::1'):
+            self.assertIn(address, ip_set)
+        self.assertNotIn('10.0.0.6', ip_set)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import socket
+import threading
+import time
+import unittest
+
+from probes import HTTPProbe, RDPProbe, SSHProbe, TCPProbe, WinRMProbe, run_probes
+
+# RDP Connection Confirm com RDP Negotiation Response (protocolo CredSSP)
+RDP_CONFIRM = bytes.fromhex('030000130ed000001234000200080002000000')
+
+
+class FakeServer:
+    """Servidor TCP local que responde a uma conexão com uma resposta fixa (ou nada)."""
+
+    def __init__(self, response=b'', read_request=False, hold=0.0):
+        self.response = response
+        self.read_request = read_request
+        self.hold = hold  # Tempo (segundos) com a conexão aberta após responder
+        self.request = b''
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(1)
+        self.port = self.listener.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        try:
+            connection, _ = self.listener.accept()
+        except OSError:
+            return  # Servidor fechado antes de aceitar (a sonda já concluiu com o handshake)
+        with connection:
+            connection.settimeout(2)
+            if self.read_request:
+                try:
+                    self.request = connection.recv(4096)
+                except OSError:
+                    pass
+            if self.response:
+                connection.sendall(self.response)
+            time.sleep(self.hold)
+
+    def close(self):
+        self.listener.close()
+        self.thread.join(timeout=3)
+
+
+def free_port():
+    """Porta local sem nenhum servidor escutando."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class ProbeParseTest(unittest.TestCase):
+
+    def test_ssh_banner(self):
+        self.assertEqual(SSHProbe().parse(b'SSH-2.0-OpenSSH_9.6\r\nresto'), 'SSH-2.0-OpenSSH_9.6')
+        self.assertEqual(SSHProbe().parse(b'HTTP/1.1 400\r\n'), '')
+
+    def test_rdp_confirm(self):
+        self.assertEqual(RDPProbe().parse(RDP_CONFIRM), 'RDP (CredSSP)')
+        self.assertEqual(RDPProbe().parse(b'\x03\x00\x00\x0b\x06\xd0\x00\x00\x00\x00\x00'), 'RDP')
+        self.assertEqual(RDPProbe().parse(b'SSH-2.0\r\n'), '')
+
+    def test_http_status_and_server(self):
+        response = b'HTTP/1.1 401 Unauthorized\r\nServer: Microsoft-HTTPAPI/2.0\r\n\r\n'
+        self.assertEqual(WinRMProbe().parse(response), 'WinRM 401 (Microsoft-HTTPAPI/2.0)')
+        self.assertEqual(HTTPProbe().parse(b'\x00\x01'), '')
+
+
+class RunProbesTest(unittest.TestCase):
+
+    def run_probe(self, probe, server=None):
+        try:
+            return run_probes(['127.0.0.1'], [probe], timeout=2)[probe.name]
+        finally:
+            if server is not None:
+                server.close()
+
+    def test_ssh_server(self):
+        server = FakeServer(b'SSH-2.0-OpenSSH_9.6\r\n', hold=1)
+        result = self.run_probe(SSHProbe(port=server.port), server)
+        self.assertTrue(result.open)
+        self.assertEqual(result.detail, 'SSH-2.0-OpenSSH_9.6')
+        self.assertEqual(result.address, '127.0.0.1')
+        self.assertIsNotNone(result.rtt)
+
+    def test_http_server(self):
+        server = FakeServer(b'HTTP/1.1 200 OK\r\nServer: nginx\r\n\r\n', read_request=True)
+        result = self.run_probe(HTTPProbe(port=server.port), server)
+        self.assertTrue(result.open)
+        self.assertEqual(result.detail, 'HTTP 200 (nginx)')
+        self.assertTrue(server.request.startswith(b'HEAD / HTTP/1.1\r\n'))
+
+    def test_rdp_server(self):
+        server = FakeServer(RDP_CONFIRM, read_request=True, hold=1)
+        result = self.run_probe(RDPProbe(port=server.port), server)
+        self.assertTrue(result.open)
+        self.assertEqual(result.detail, 'RDP (CredSSP)')
+        self.assertEqual(server.request, RDPProbe.CONNECTION_REQUEST)
+
+    def test_refused_port(self):
+        result = self.run_probe(SSHProbe(port=free_port()))
+        self.assertFalse(result.open)
+        self.assertIsNotNone(result.rtt)  # A recusa também é uma resposta do host
+
+    def test_silent_server(self):
+        server = FakeServer(hold=2)
+        probe = SSHProbe(port=server.port, time_budget=0.3)
+        try:
+            started = time.monotonic()
+            result = run_probes(['127.0.0.1'], [probe], timeout=2)[probe.name]
+            elapsed = time.monotonic() - started
+        finally:
+            server.close()
+        self.assertTrue(result.open)  # A porta aceitou a conexão, mesmo sem banner
+        self.assertFalse(result.detail)
+        self.assertLess(elapsed, 1.5)  # Respeita o orçamento de tempo da sonda
+
+    def test_connect_only_probe(self):
+        server = FakeServer()
+        result = self.run_probe(TCPProbe(port=server.port, name='Teste'), server)
+        self.assertTrue(result.open)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import threading
+import time
+import unittest
+
+from scan_controller import ScanController
+
+# Tempo máximo (segundos) de espera pelo fim de uma varredura nos testes
+WAIT_TIMEOUT = 5
+
+
+class Recorder:
+    """Tarefa de teste: registra a ordem dos hosts executados; o primeiro aguarda a liberação do gate."""
+
+    def __init__(self):
+        self.order = []
+        self.lock = threading.Lock()
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def __call__(self, host, job):
+        if not self.started.is_set():
+            self.started.set()
+            self.gate.wait(WAIT_TIMEOUT)
+        with self.lock:
+            self.order.append(host)
+
+
+class FairnessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = ScanController(max_workers=1)
+        self.addCleanup(self.controller.shutdown)
+
+    def test_jobs_interleave(self):
+        task = Recorder()
+        sweep = self.controller.submit([f"big{index}" for index in range(1000)], task)
+        self.assertTrue(task.started.wait(WAIT_TIMEOUT))  # O primeiro host da varredura grande ocupa o pool
+        small = self.controller.submit([f"small{index}" for index in range(10)], task)
+        task.gate.set()
+        self.assertTrue(small.done.wait(WAIT_TIMEOUT))
+        with task.lock:
+            position = max(task.order.index(f"small{index}") for index in range(10))
+        self.assertLess(position, 25)  # A varredura pequena não espera os 1000 hosts da grande
+        self.assertTrue(sweep.done.wait(WAIT_TIMEOUT))
+        self.assertEqual(len(task.order), 1010)
+
+    def test_job_order_preserved(self):
+        task = Recorder()
+        task.started.set()
+        job = self.controller.submit([f"h{index}" for index in range(50)], task)
+        self.assertTrue(job.done.wait(WAIT_TIMEOUT))
+        self.assertEqual(task.order, [f"h{index}" for index in range(50)])
+
+
+class StateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = ScanController(max_workers=1)
+        self.addCleanup(self.controller.shutdown)
+        self.task = Recorder()
+        self.hosts = [f"h{index}" for index in range(20)]
+        self.job = self.controller.submit(self.hosts, self.task)
+        self.assertTrue(self.task.started.wait(WAIT_TIMEOUT))  # h0 ocupa a única thread do pool
+
+    def wait_parked(self):
+        """Aguarda o despachante retirar todas as entradas da fila (estacionadas pela pausa)."""
+        limit = time.monotonic() + WAIT_TIMEOUT
+        while time.monotonic() < limit:
+            with self.controller._condition:
+                if not self.controller._heap:
+                    return
+            time.sleep(0.01)
+        self.fail("Entradas não estacionadas")
+
+    def test_pause_then_cancel_finishes(self):
+        finished = []
+        self.job.on_done = finished.append
+        self.controller.pause(self.job.job_id)
+        self.task.gate.set()
+        self.wait_parked()
+        self.controller.cancel(self.job.job_id)
+        self.assertTrue(self.job.done.wait(WAIT_TIMEOUT))
+        self.assertEqual(finished, [self.job])
+        self.assertEqual(self.task.order, ['h0'])
+        self.assertIsNone(self.controller.get_job(self.job.job_id))
+
+    def test_reprioritized_and_resumed_run_once(self):
+        self.controller.pause(self.job.job_id)
+        self.controller.prioritize(self.job.job_id, ['h10', 'h15'])
+        self.task.gate.set()
+        self.wait_parked()
+        self.controller.prioritize(self.job.job_id, ['h18'])  # Repriorizado já estacionado
+        self.wait_parked()
+        self.assertEqual(self.task.order, ['h0'])  # Nada é despachado durante a pausa
+        self.controller.resume(self.job.job_id)
+        self.assertTrue(self.job.done.wait(WAIT_TIMEOUT))
+        self.assertEqual(sorted(self.task.order), sorted(self.hosts))  # Cada host exatamente uma vez
+        self.assertEqual(self.task.order[:4], ['h0', 'h10', 'h15', 'h18'])
+        self.assertEqual(self.job.completed, len(self.hosts))
+
+
+if __name__ == '__main__':
+    unittest.main()
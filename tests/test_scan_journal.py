@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+import unittest
+
+from scan_journal import ScanJournal
+
+
+class JournalRecoveryTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = os.path.join(self.directory, 'scan.jsonl')
+
+    def test_truncated_last_line(self):
+        with open(self.path, 'w', encoding='utf-8') as journal_file:
+            journal_file.write(json.dumps({'host': 'a', 'result': ['a', 1]}) + '\n')
+            journal_file.write(json.dumps({'host': 'b', 'result': ['b', 2]}) + '\n')
+            journal_file.write('{"host": "c", "res')  # Gravação interrompida
+        journal = ScanJournal('scan', directory=self.directory)
+        self.assertEqual(journal.completed, {'a': ('a', 1), 'b': ('b', 2)})
+        journal.append('d', ('d', 4))
+        journal.close()
+
+        with open(self.path, encoding='utf-8') as journal_file:
+            lines = journal_file.read().split('\n')
+        self.assertEqual(lines[2], '{"host": "c", "res')  # A linha incompleta fica isolada
+        self.assertEqual(json.loads(lines[3]), {'host': 'd', 'result': ['d', 4]})
+
+        journal = ScanJournal('scan', directory=self.directory)
+        self.assertEqual(journal.completed, {'a': ('a', 1), 'b': ('b', 2), 'd': ('d', 4)})
+        journal.finish()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_complete_journal_untouched(self):
+        journal = ScanJournal('scan', directory=self.directory)
+        journal.append('a', ('a', 1))
+        journal.close()
+        journal = ScanJournal('scan', directory=self.directory)
+        journal.append('b', ('b', 2))
+        journal.close()
+        with open(self.path, encoding='utf-8') as journal_file:
+            self.assertEqual(len(journal_file.read().splitlines()), 2)  # Nenhuma linha vazia inserida
+
+
+if __name__ == '__main__':
+    unittest.main()
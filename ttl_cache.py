@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ========================================================================
+# Cache com tempo de validade (TTL) do HostFlow
+# Guarda os resultados recentes de DNS, ping e sondas, compartilhados entre
+# varreduras (e entre os clientes do serviço HTTP).
+# ========================================================================
+
+
+class TTLCache:
+    """Cache thread-safe com validade por entrada e descarte dos itens menos usados ao atingir o limite."""
+
+    def __init__(self, ttl, max_entries=100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # chave -> (expira_em, valor, validade)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Retorna o valor válido da chave ou None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]  # Expirado
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, ttl=None):
+        """Armazena o valor com a validade padrão (ou a informada, em segundos)."""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value, ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def remaining(self, key):
+        """Validade restante (segundos) da chave, ou None se ausente ou expirada (não conta como acesso)."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        remaining = entry[0] - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def remaining_fraction(self, key):
+        """Fração (0 a 1) da validade da chave que ainda resta, ou None se ausente ou expirada."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        remaining = entry[0] - time.monotonic()
+        return remaining / entry[2] if remaining > 0 and entry[2] > 0 else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        """Resumo do uso do cache."""
+        return {'entries': len(self), 'hits': self.hits, 'misses': self.misses}